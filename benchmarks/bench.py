@@ -0,0 +1,257 @@
+"""Benchmarks of the_conf on synthetic configurations.
+
+    python -m benchmarks.bench run -o base.json
+    python -m benchmarks.bench run -o head.json
+    python -m benchmarks.bench compare base.json head.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from copy import deepcopy
+
+import yaml
+
+from benchmarks import generators
+from the_conf import TheConf, files, node
+
+FORMAT = 1
+
+
+def measure(func, setup=None, repeat=5):
+    """Time func repeat times, setup's result being passed to it and its
+    duration excluded."""
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "repeat": repeat,
+    }
+
+
+class Scenario:
+    def __init__(self, name, parameters, items, tmp_dir, noise):
+        self.name = name
+        self.parameters = parameters
+        self.config = generators.make_config(parameters, items)
+        self.environ = generators.make_environ(self.config, noise)
+        self.cmd_line = generators.make_cmd_line(self.config)
+        self.path = os.path.join(tmp_dir, f"{name}.yml")
+        with open(self.path, "w") as fd:
+            yaml.dump(self.config, fd, Dumper=yaml.Dumper)
+        self.json_path = os.path.join(tmp_dir, f"{name}.json")
+        with open(self.json_path, "w") as fd:
+            json.dump(self.config, fd)
+        self.leaves = list(generators.iter_leaves(self.config))
+
+    def metaconf(self, source_order=(), **extra):
+        return dict(
+            parameters=deepcopy(self.parameters),
+            source_order=list(source_order),
+            config_files=[self.path],
+            **extra,
+        )
+
+    def build(self, source_order=(), **kwargs):
+        return TheConf(
+            self.metaconf(source_order),
+            cmd_line_opts=self.cmd_line,
+            environ=self.environ,
+            **kwargs,
+        )
+
+    def benchmarks(self):
+        yield "compile", self.metaconf, lambda mc: TheConf(mc)
+
+        def load(loader):
+            def setup():
+                conf = self.build()
+                files.invalidate_cache()
+                return conf
+
+            return setup, loader
+
+        yield "load_cmd", *load(lambda conf: conf._load_cmd(self.cmd_line))
+        yield "load_files", *load(lambda conf: conf._load_files())
+        yield "load_files_cached", self.build, lambda conf: (
+            conf._load_files()
+        )
+
+        def read_json(_):
+            return list(files.read([self.json_path]))
+
+        yield "read_json", files.invalidate_cache, read_json
+        yield "read_json_cached", lambda: read_json(None), read_json
+        yield "load_env", *load(lambda conf: conf._load_env(self.environ))
+        yield "construct", self.metaconf, lambda mc: TheConf(
+            {**mc, "source_order": ["cmd", "files", "env"]},
+            cmd_line_opts=self.cmd_line,
+            environ=self.environ,
+        )
+
+        def loaded():
+            conf = self.build(["files"], reloadable=True)
+            files.invalidate_cache()
+            return conf
+
+        yield "reload", loaded, lambda conf: conf.reload()
+        yield "path_val_param", loaded, lambda conf: list(
+            conf._get_path_val_param()
+        )
+
+        def read_all(conf):
+            for path, _ in self.leaves:
+                get(conf, path)
+
+        yield "read", loaded, read_all
+
+        # keys read by string over and over, as many as accessors cached
+        hot = self.leaves[: node.ACCESSORS_CACHE_SIZE]
+        dotted = [".".join(path) for path, _ in hot]
+
+        def read_hot(conf):
+            for path, _ in hot:
+                get(conf, path)
+
+        def get_hot(conf):
+            for path in dotted:
+                conf.get(path)
+
+        def warmed():
+            conf = loaded()
+            get_hot(conf)
+            return conf
+
+        yield "read_hot", loaded, read_hot
+        yield "get_hot", warmed, get_hot
+        yield "freeze", loaded, lambda conf: conf.freeze()
+
+        out = self.path + ".out.yml"
+
+        def written():
+            conf = loaded()
+            if os.path.exists(out):
+                os.unlink(out)
+            return conf
+
+        yield "write", written, lambda conf: conf.write(out)
+
+        def dirty():
+            conf = written()
+            conf.write(out)
+            path, value = next(
+                leaf for leaf in self.leaves if not leaf[0][-1].isdigit()
+            )
+            value = value + 1 if isinstance(value, int) else value + "0"
+            setattr(get(conf, path[:-1]), path[-1], value)
+            return conf
+
+        yield "write_dirty", dirty, lambda conf: conf.write(out)
+
+
+def get(conf, path):
+    for part in path:
+        conf = conf[int(part)] if part.isdigit() else getattr(conf, part)
+    return conf
+
+
+def get_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale=1.0, repeat=5, noise=2000, pattern=None, output=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, (parameters, items) in generators.scenarios(scale).items():
+            scenario = Scenario(
+                name, parameters, items, tmp_dir, int(noise * scale)
+            )
+            for bench, setup, func in scenario.benchmarks():
+                key = f"{name}.{bench}"
+                if pattern and not re.search(pattern, key):
+                    continue
+                results[key] = measure(func, setup, repeat)
+                print(
+                    f"{key:<30} {results[key]['median'] * 1000:10.3f}ms",
+                    file=sys.stderr,
+                )
+    report = {
+        "format": FORMAT,
+        "revision": get_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+        "scale": scale,
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as fd:
+            json.dump(report, fd, indent=2)
+    return report
+
+
+def compare(base, head, stat="median"):
+    """Print the timings of head against base."""
+    with open(base) as fd:
+        base = json.load(fd)
+    with open(head) as fd:
+        head = json.load(fd)
+    print(
+        f"{'benchmark':<30} {base['revision'] or 'base':>12} "
+        f"{head['revision'] or 'head':>12} {'ratio':>8}"
+    )
+    for key, result in head["results"].items():
+        if key not in base["results"]:
+            continue
+        before, after = base["results"][key][stat], result[stat]
+        print(
+            f"{key:<30} {before * 1000:10.3f}ms {after * 1000:10.3f}ms "
+            f"{after / before if before else float('inf'):8.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run")
+    run_parser.add_argument("-o", "--output", help="JSON file to write")
+    run_parser.add_argument("-s", "--scale", type=float, default=1.0)
+    run_parser.add_argument("-r", "--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "-n", "--noise", type=int, default=2000, help="unrelated env vars"
+    )
+    run_parser.add_argument("-k", "--pattern", help="benchmarks to run")
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument(
+        "--stat", default="median", choices=["min", "median", "mean"]
+    )
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args.base, args.head, args.stat)
+    run(args.scale, args.repeat, args.noise, args.pattern, args.output)
+
+
+if __name__ == "__main__":
+    main()
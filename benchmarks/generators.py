@@ -0,0 +1,105 @@
+"""Synthetic metaconfs, config files, environs and command lines."""
+from the_conf.command_line import path_to_cmd_opt
+from the_conf.environement import path_to_env_key
+from the_conf.node import parse_parameter
+from the_conf.utils import TYPE_MAPPING
+
+TYPES = (int, str)
+
+
+def wide_metaconf(width):
+    """width parameters at the root of the configuration."""
+    return [
+        {f"option{index}": {"type": TYPES[index % len(TYPES)]}}
+        for index in range(width)
+    ]
+
+
+def deep_metaconf(depth, breadth):
+    """depth nested nodes, each holding breadth parameters."""
+    parameters = []
+    for level in reversed(range(depth)):
+        parameters = [
+            {f"value{index}": {"type": TYPES[index % len(TYPES)]}}
+            for index in range(breadth)
+        ] + ([{f"level{level + 1}": parameters}] if parameters else [])
+    return [{"level0": parameters}]
+
+
+def list_metaconf(fields):
+    """A list of nodes with fields parameters each and simple lists, one of
+    them with compact storage."""
+    return [
+        {
+            "type": "list",
+            "items": [
+                {f"field{index}": {"type": TYPES[index % len(TYPES)]}}
+                for index in range(fields)
+            ],
+        },
+        {"type": "list", "names": {"type": str}},
+        {"type": "list", "numbers": {"type": int, "storage": "array"}},
+    ]
+
+
+def _sample(settings, index):
+    if TYPE_MAPPING.get(settings.get("type"), settings.get("type")) is int:
+        return index
+    return f"value{index}"
+
+
+def make_config(parameters, items=10):
+    """Return a config holding a value for every parameter, lists holding
+    items items."""
+    config = {}
+    for index, parameter in enumerate(parameters):
+        node_type, name, is_node = parse_parameter(parameter)
+        settings = parameter[name]
+        if node_type is list and is_node:
+            config[name] = [make_config(settings, items) for _ in range(items)]
+        elif node_type is list:
+            config[name] = [_sample(settings, i) for i in range(items)]
+        elif is_node:
+            config[name] = make_config(settings, items)
+        else:
+            config[name] = _sample(settings, index)
+    return config
+
+
+def iter_leaves(config, path=()):
+    if isinstance(config, dict):
+        for key, value in config.items():
+            yield from iter_leaves(value, path + (key,))
+    elif isinstance(config, list):
+        for index, value in enumerate(config):
+            yield from iter_leaves(value, path + (str(index),))
+    else:
+        yield path, config
+
+
+def make_environ(config, noise=0):
+    """Return an environ holding every value of config, and noise unrelated
+    variables."""
+    environ = {f"UNRELATED_VARIABLE_{i}": str(i) for i in range(noise)}
+    for path, value in iter_leaves(config):
+        environ[path_to_env_key(path)] = str(value)
+    return environ
+
+
+def make_cmd_line(config):
+    """Return command line options for the values of config living outside
+    of lists, the only ones settable from there."""
+    return [
+        f"{path_to_cmd_opt(path)}={value}"
+        for path, value in iter_leaves(config)
+        if not any(part.isdigit() for part in path)
+    ]
+
+
+def scenarios(scale=1):
+    """Return the metaconf parameters and list sizes of each scenario."""
+    return {
+        "wide": (wide_metaconf(int(2000 * scale)), 10),
+        "deep": (deep_metaconf(int(50 * scale), 10), 10),
+        "lists": (list_metaconf(10), int(200 * scale)),
+    }
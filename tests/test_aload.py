@@ -0,0 +1,76 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from the_conf import TheConf
+
+
+class TestAsyncLoad(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.first = self.write(
+            "first.yml", "option: first\nnode:\n  value: 1\n"
+        )
+        self.second = self.write(
+            "second.json",
+            '{"option": "second", "other": 2, "items": [{"name": "a"}]}',
+        )
+        self.metaconf = {
+            "parameters": [
+                {"option": {"type": str}},
+                {"other": {"type": int, "default": 0}},
+                {"node": [{"value": {"type": int}}]},
+                {"type": "list", "items": [{"name": {"type": str}}]},
+                {"env_option": {"type": str}},
+            ],
+            "source_order": ["cmd", "env", "files"],
+            "config_files": [self.first, self.second],
+        }
+        self.kwargs = {
+            "cmd_line_opts": ["--node-value=3"],
+            "environ": {"ENV_OPTION": "env", "OTHER": "4"},
+            "load_stats": True,
+            "reloadable": True,
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as fd:
+            fd.write(content)
+        return path
+
+    def test_aload(self):
+        sync = TheConf(self.metaconf, **self.kwargs)
+
+        async def aload():
+            with ThreadPoolExecutor(2) as executor:
+                return await TheConf.aload(
+                    self.metaconf, executor=executor, **self.kwargs
+                )
+
+        conf = asyncio.run(aload())
+        self.assertEqual(sync.freeze(), conf.freeze())
+        self.assertEqual(sync._sources, conf._sources)
+        self.assertEqual(("first", 4, 3), (conf.option, conf.other, conf.node.value))
+        self.assertEqual(
+            [self.first, self.second],
+            [details["path"] for details in conf.load_stats.files],
+        )
+        self.assertEqual(
+            list(sync.load_stats.phases), list(conf.load_stats.phases)
+        )
+
+    def test_areload(self):
+        sync = TheConf(self.metaconf, **self.kwargs)
+        conf = TheConf(self.metaconf, **self.kwargs)
+        self.write("first.yml", "node:\n  value: 2\n")
+        self.write("second.json", '{"option": "changed", "items": []}')
+        expected = sync.reload()
+        self.assertEqual(sorted(expected), sorted(asyncio.run(conf.areload())))
+        self.assertEqual(sync.freeze(), conf.freeze())
+        self.assertEqual("changed", conf.option)
@@ -0,0 +1,66 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase, mock
+
+from the_conf import TheConf
+
+METACONF = """
+source_order: ['env']
+parameters:
+  - option:
+    - option: {type: str, default: a}
+  - type: list
+    intlist: {type: int}
+  - other: {type: int}
+"""
+
+
+class TestMetaconfCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        fd, self.metaconf = tempfile.mkstemp(suffix=".yml")
+        with os.fdopen(fd, "w") as fp:
+            fp.write(METACONF)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+        os.unlink(self.metaconf)
+
+    def test_cache_reused(self):
+        environ = {"INTLIST_0": 1, "OTHER": "2"}
+        tc = TheConf(
+            self.metaconf, environ=environ, metaconf_cache=self.cache_dir.name
+        )
+        self.assertEqual(1, len(os.listdir(self.cache_dir.name)))
+        with mock.patch("the_conf.files.read") as read_patch:
+            cached = TheConf(
+                self.metaconf,
+                environ=environ,
+                metaconf_cache=self.cache_dir.name,
+            )
+        read_patch.assert_not_called()
+        self.assertEqual(repr(tc), repr(cached))
+        self.assertIs(cached, cached.option._parent)
+        self.assertIs(cached, cached._schema[("other",)][1])
+        self.assertRaises(ValueError, setattr, cached, "other", "x")
+
+    def test_cache_invalidated_on_change(self):
+        TheConf(self.metaconf, environ={}, metaconf_cache=self.cache_dir.name)
+        with open(self.metaconf, "a") as fp:
+            fp.write("  - new: {default: 1}\n")
+        tc = TheConf(
+            self.metaconf, environ={}, metaconf_cache=self.cache_dir.name
+        )
+        self.assertEqual(1, tc.new)
+        self.assertEqual(2, len(os.listdir(self.cache_dir.name)))
+
+    def test_cache_write_failure(self):
+        with mock.patch(
+            "the_conf.cache._Pickler.dump", side_effect=pickle.PicklingError
+        ):
+            tc = TheConf(
+                self.metaconf, environ={}, metaconf_cache=self.cache_dir.name
+            )
+        self.assertEqual("a", tc.option.option)
+        self.assertEqual([], os.listdir(self.cache_dir.name))
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+from the_conf import TheConf, command_line
+
+
+class TestCommandLineMethods(unittest.TestCase):
+    def test_has_known_flag(self):
+        flags = {"-C", "--config", "--option"}
+        self.assertFalse(command_line.has_known_flag([], flags))
+        self.assertFalse(
+            command_line.has_known_flag(["value", "-", "--other"], flags)
+        )
+        self.assertFalse(command_line.has_known_flag(["--", "-C"], flags))
+        self.assertTrue(command_line.has_known_flag(["--opt=a"], flags))
+        self.assertTrue(command_line.has_known_flag(["-Cfile.yml"], flags))
+        self.assertTrue(command_line.has_known_flag(["--config"], flags))
+
+    def test_parser_reused(self):
+        metaconf = {
+            "parameters": [{"option": {"type": str, "among": ["a", "b"]}}],
+            "source_order": ["cmd"],
+        }
+        tc = TheConf(metaconf, cmd_line_opts=["--option=a"])
+        self.assertEqual("a", tc.option)
+        parser = command_line.get_parser(
+            tc._get_path_val_param(), ["-C"], ["-P"]
+        )
+        self.assertIs(
+            parser,
+            command_line.get_parser(tc._get_path_val_param(), ["-C"], ["-P"]),
+        )
+        with mock.patch("argparse.ArgumentParser.parse_known_args") as parse:
+            tc = TheConf(metaconf, cmd_line_opts=["--unknown", "value"])
+        parse.assert_not_called()
+        self.assertRaises(AttributeError, getattr, tc, "option")
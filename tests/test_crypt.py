@@ -0,0 +1,68 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase
+
+from the_conf import files
+from the_conf.__main__ import main
+
+KEY, NEW_KEY = "k" * 32, "n" * 32
+
+
+class TestCrypt(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.tmp_dir.name, f"conf{index}.yml")
+            with open(path, "w") as fd:
+                fd.write(f"option: {index}\n")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, passkey=None):
+        files.invalidate_cache()
+        return [
+            config["option"]
+            for _, config in files.read(self.paths, passkey=passkey)
+        ]
+
+    def crypt(self, *args):
+        pattern = os.path.join(self.tmp_dir.name, "*.yml")
+        with redirect_stderr(io.StringIO()):
+            return main(["--file", pattern, "--key", KEY, *args])
+
+    def test_encrypt_rotate_decrypt(self):
+        self.assertEqual(0, self.crypt("--mode", "encrypt"))
+        self.assertEqual([0, 1, 2], self.read(KEY))
+        self.assertEqual(
+            0, self.crypt("--mode", "rotate", "--new_key", NEW_KEY)
+        )
+        self.assertEqual([], self.read(KEY))
+        self.assertEqual([0, 1, 2], self.read(NEW_KEY))
+        self.assertEqual(2, self.crypt("--mode", "rotate"))
+
+        self.assertEqual(
+            1, self.crypt("--mode", "decrypt", "--workers", "1")
+        )  # wrong key
+        with redirect_stderr(io.StringIO()):
+            returned = main(
+                ["--mode=decrypt", "--key", NEW_KEY, "--file"]
+                + [",".join(self.paths)]
+            )
+        self.assertEqual(0, returned)
+        self.assertEqual([0, 1, 2], self.read())
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in self.paths),
+            sorted(os.listdir(self.tmp_dir.name)),
+        )
+
+    def test_help(self):
+        out = io.StringIO()
+        with redirect_stdout(out), self.assertRaises(SystemExit):
+            main(["--help"])
+        self.assertIn("encrypt files with in rotate mode", out.getvalue())
+        self.assertIn("as many as CPUs by default", out.getvalue())
@@ -0,0 +1,37 @@
+import unittest
+
+from the_conf import environement
+from the_conf.utils import Index
+
+
+class TestEnvironementMethods(unittest.TestCase):
+    def test_matcher(self):
+        matcher = environement.EnvironMatcher(
+            [["eki", Index, "patang"], ["eki", "ki"], ["ints", Index]]
+        )
+        environ = {
+            "INTS_10": "c",
+            "EKI_KI": "a",
+            "INTS_2": "b",
+            "EKI_1_PATANG": "d",
+            "EKI_1_PATANG_2": "ignored",
+            "OTHER": "ignored",
+        }
+        self.assertEqual(
+            [
+                (("eki", Index, "patang"), ["eki", 1, "patang"], "d"),
+                (("eki", "ki"), ["eki", "ki"], "a"),
+                (("ints", Index), ["ints", 2], "b"),
+                (("ints", Index), ["ints", 10], "c"),
+            ],
+            matcher.match(environ),
+        )
+
+    def test_iter_on_environ_from_path(self):
+        environ = {"EKI_10": "b", "EKI_9": "a"}
+        self.assertEqual(
+            [(["eki", 9], "a"), (["eki", 10], "b")],
+            list(
+                environement.iter_on_environ_from_path(["eki", Index], environ)
+            ),
+        )
@@ -1,4 +1,8 @@
+import io
+import os
+import tempfile
 import unittest
+from unittest import mock
 
 from the_conf import files
 
@@ -22,3 +26,185 @@ class TestFileMethods(unittest.TestCase):
             [(["path1", "sub"], 1), (["path2"], 2)],
             list(files.extract_values(paths, config, "")),
         )
+
+    def test_get_backend(self):
+        self.assertIsNone(files.get_backend("conf.txt"))
+        self.assertIs(
+            files.BACKENDS["json"]["json"],
+            files.get_backend("conf.json", {"json": "json"}),
+        )
+        self.assertIs(
+            files.get_backend("conf.yml"),
+            files.get_backend("conf.yml", {"yaml": "unavailable"}),
+        )
+        for name, (loads, dumps) in files.BACKENDS["yaml"].items():
+            self.assertEqual({"a": [1, 2]}, loads(dumps({"a": [1, 2]})))
+        for name, (loads, dumps) in files.BACKENDS["json"].items():
+            self.assertEqual({"a": [1, 2]}, loads(dumps({"a": [1, 2]})))
+
+    def test_read_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conf.json")
+            with open(path, "w") as fd:
+                fd.write('{"a": [1, 2]}')
+            loads = mock.Mock(side_effect=files.json.loads)
+            backend = (loads, files.json.dumps)
+            with mock.patch("the_conf.files.get_backend") as get_backend:
+                get_backend.return_value = backend
+                _, config = next(files.read([path]))
+                config["a"].append(3)
+                self.assertEqual(
+                    [(path, {"a": [1, 2]})], list(files.read([path]))
+                )
+                self.assertEqual(1, loads.call_count)
+                list(files.read([path], passkey="0" * 32))
+                self.assertEqual(2, loads.call_count)
+                files.invalidate_cache(path)
+                list(files.read([path]))
+                self.assertEqual(3, loads.call_count)
+                with open(path, "w") as fd:
+                    fd.write('{"a": [1, 2, 3, 4]}')
+                self.assertEqual(
+                    [(path, {"a": [1, 2, 3, 4]})], list(files.read([path]))
+                )
+                self.assertEqual(4, loads.call_count)
+                # copies handed out on cache hits are independent too
+                for _ in range(2):
+                    _, config = next(files.read([path]))
+                    config["a"].append(5)
+                    config["b"] = {}
+                self.assertEqual(
+                    [(path, {"a": [1, 2, 3, 4]})], list(files.read([path]))
+                )
+                self.assertEqual(4, loads.call_count)
+
+    def test_write(self):
+        passkey = "k" * 32
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conf.yml")
+            self.assertTrue(files.write({"a": 1}, path))
+            mtime = os.stat(path).st_mtime_ns
+            self.assertFalse(files.write({"a": 1}, path))
+            self.assertEqual(mtime, os.stat(path).st_mtime_ns)
+            os.chmod(path, 0o600)
+            self.assertTrue(files.write({"a": 2}, path, passkey=passkey))
+            self.assertEqual(0o600, os.stat(path).st_mode & 0o777)
+            self.assertEqual(["conf.yml"], os.listdir(tmp_dir))
+            with open(path, "rb") as fd:
+                self.assertTrue(fd.read().startswith(files.STREAM_MAGIC))
+            self.assertFalse(files.write({"a": 2}, path, passkey=passkey))
+            self.assertEqual(
+                [(path, {"a": 2})], list(files.read([path], passkey))
+            )
+            with mock.patch("os.replace", side_effect=OSError):
+                self.assertRaises(OSError, files.write, {"a": 3}, path)
+            self.assertEqual(["conf.yml"], os.listdir(tmp_dir))
+
+    def test_write_symlink(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            real_dir = os.path.join(tmp_dir, "real")
+            os.mkdir(real_dir)
+            target = os.path.join(real_dir, "conf.yml")
+            link = os.path.join(tmp_dir, "conf.yml")
+            with open(target, "w") as fd:
+                fd.write("a: 1\n")
+            os.symlink(target, link)
+            self.assertTrue(files.write({"a": 2}, link))
+            self.assertTrue(os.path.islink(link))
+            self.assertEqual([(link, {"a": 2})], list(files.read([link])))
+            self.assertEqual(["conf.yml"], os.listdir(real_dir))
+
+    def test_write_umask(self):
+        umask = os.umask(0o027)
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "conf.yml")
+                with mock.patch("os.umask") as umask_mock:
+                    files.write_atomic(path, "a: 1\n")
+                    files.write_atomic(path + ".key", "", mode=0o600)
+                umask_mock.assert_not_called()
+                self.assertEqual(0o640, os.stat(path).st_mode & 0o777)
+                self.assertEqual(
+                    0o600, os.stat(path + ".key").st_mode & 0o777
+                )
+        finally:
+            os.umask(umask)
+
+    def test_encrypt_stream(self):
+        passkey = "k" * 32
+        payload = "a: é\n" * 10
+        for chunk_size in 1, 7, len(payload.encode()), 1024:
+            fp = io.BytesIO()
+            files.encrypt_stream(payload, passkey, fp, chunk_size=chunk_size)
+            fp.seek(0)
+            decrypted = files.open_decrypted(fp, passkey)
+            self.assertEqual(payload, decrypted.read())
+
+        fp = io.BytesIO()
+        files.encrypt_stream(payload, passkey, fp, chunk_size=7)
+        content = fp.getvalue()
+        for corrupted in (
+            content[:-1],  # truncated
+            content[:-30] + bytes([content[-30] ^ 1]) + content[-29:],
+        ):
+            stream = files.open_decrypted(io.BytesIO(corrupted), passkey)
+            self.assertRaises(RuntimeError, stream.read)
+        stream = files.open_decrypted(io.BytesIO(content), "o" * 32)
+        self.assertRaises(RuntimeError, stream.read)
+
+    def test_read_encrypted(self):
+        passkey = "k" * 32
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            legacy = os.path.join(tmp_dir, "legacy.yml")
+            with open(legacy, "w") as fd:
+                fd.write(files.encrypt("a: 1", passkey))
+            chunked = os.path.join(tmp_dir, "chunked.json")
+            with open(chunked, "wb") as fd:
+                files.encrypt_stream('{"a": 2}', passkey, fd, chunk_size=3)
+            self.assertEqual(
+                [(legacy, {"a": 1}), (chunked, {"a": 2})],
+                list(files.read([legacy, chunked], passkey)),
+            )
+            files.invalidate_cache()
+            self.assertEqual([], list(files.read([chunked])))
+
+    def test_expand_paths(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            def join(*names):
+                return [os.path.join(tmp_dir, name) for name in names]
+
+            os.mkdir(os.path.join(tmp_dir, "sub"))
+            for path in join(
+                "b.yml", "a.json", ".c.yml", "d.txt", "sub/e.yml"
+            ):
+                with open(path, "w") as fd:
+                    fd.write("{}")
+            self.assertEqual(
+                join("a.json", "b.yml", "missing.yml"),
+                files.expand_paths(
+                    [tmp_dir, os.path.join(tmp_dir, "*.yml")]
+                    + join("missing.yml")
+                ),
+            )
+            self.assertEqual(
+                join("b.yml", "sub/e.yml"),
+                files.expand_paths([os.path.join(tmp_dir, "**", "*.yml")]),
+            )
+
+    def test_read_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for index in range(20):
+                paths.append(os.path.join(tmp_dir, f"{index:02}.json"))
+                with open(paths[-1], "w") as fd:
+                    fd.write(f'{{"index": {index}}}')
+            stats = []
+            with mock.patch.object(files, "_get_read_executor") as executor:
+                executor.return_value = files.ThreadPoolExecutor(4)
+                self.assertEqual(
+                    [(path, {"index": i}) for i, path in enumerate(paths)],
+                    list(files.read([tmp_dir], stats=stats)),
+                )
+            executor.assert_called_once_with()
+            self.assertEqual(paths, [details["path"] for details in stats])
@@ -0,0 +1,99 @@
+from unittest import TestCase
+
+from the_conf import TheConf
+from the_conf.node import compile_getter
+
+METACONF = {
+    "parameters": [
+        {
+            "db": [
+                {"host": {"type": str}},
+                {"port": {"type": int, "default": 5432}},
+                {"options": [{"timeout": {"type": int}}]},
+            ]
+        },
+        {"type": "list", "ints": {"type": int, "storage": "array"}},
+        {"type": "list", "names": {"type": str}},
+        {"type": "list", "items": [{"key": {"type": str}}]},
+    ],
+    "source_order": ["env"],
+}
+ENVIRON = {
+    "DB_HOST": "localhost",
+    "DB_OPTIONS_TIMEOUT": "3",
+    "INTS_0": "1",
+    "INTS_1": "2",
+    "ITEMS_0_KEY": "a",
+    "ITEMS_1_KEY": "b",
+}
+
+
+class TestGetSet(TestCase):
+    def setUp(self):
+        self.conf = TheConf(METACONF, environ=ENVIRON)
+
+    def test_get(self):
+        self.assertEqual("localhost", self.conf.get("db.host"))
+        self.assertEqual(5432, self.conf.get("db.port"))
+        self.assertEqual(3, self.conf.get(["db", "options", "timeout"]))
+        self.assertEqual(3, self.conf.db.get("options.timeout"))
+        self.assertIs(self.conf.db.options, self.conf.get("db.options"))
+        self.assertEqual(2, self.conf.get("ints.1"))
+        self.assertEqual("b", self.conf.get("items.1.key"))
+        self.assertEqual("a", self.conf.items[0].get("key"))
+        self.assertIsNone(self.conf.get("items.2.key"))
+        self.assertEqual("x", self.conf.get("ints.5", default="x"))
+        self.assertEqual("x", self.conf.get("names.0", "x"))
+        self.assertIsNone(self.conf.get("db.nope"))
+        self.assertRaises(KeyError, self.conf.get, "")
+
+    def test_set(self):
+        self.conf.set("db.host", "remote")
+        self.conf.set("db.options.timeout", "10")
+        self.conf.set("ints.0", "7")
+        self.conf.set(["items", 1, "key"], "c")
+        self.assertEqual("remote", self.conf.db.host)
+        self.assertEqual(10, self.conf.db.options.timeout)
+        self.assertEqual([7, 2], list(self.conf.ints))
+        self.assertEqual(["a", "c"], [item.key for item in self.conf.items])
+        self.assertRaises(IndexError, self.conf.set, "items.2.key", "d")
+        self.assertRaises(ValueError, self.conf.set, "db.nope", 1)
+
+    def test_cache(self):
+        compile_getter.cache_clear()
+        for item in self.conf.items:
+            item.get("key")
+        self.assertEqual(1, compile_getter.cache_info().hits)
+
+        self.conf.get("items.0.key")
+        self.conf.items.clear()
+        self.assertIsNone(self.conf.get("items.0.key"))
+        self.conf.get("db.host")
+        self.conf.db.host = "remote"
+        self.assertEqual("remote", self.conf.get("db.host"))
+        del self.conf.db.host
+        self.assertEqual("x", self.conf.get("db.host", "x"))
+        self.assertEqual(2, self.conf._accessors.cache_info().misses)
+        self.assertEqual(3, self.conf._accessors.cache_info().hits)
+
+    def test_lazy(self):
+        conf = TheConf(METACONF, environ=ENVIRON, lazy=True)
+        self.assertEqual(3, conf.get("db.options.timeout"))
+        conf.set("db.options.timeout", 5)
+        self.assertEqual(5, conf.db.options.timeout)
+        self.assertEqual(5, conf.get("db.options.timeout"))
+
+    def test_colliding_names(self):
+        for lazy in False, True:
+            for parameters in (
+                [{"cache": [{"get": {"type": int}}]}],
+                [{"set": {"type": int}}],
+                [{"type": "list", "items": [{"get": {"type": str}}]}],
+            ):
+                with self.assertRaises(ValueError):
+                    TheConf({"parameters": parameters}, lazy=lazy, load=False)
+
+    def test_attr_is_not_method(self):
+        self.assertFalse(self.conf.db._has_attr("get"))
+        self.assertTrue(self.conf.db._has_attr("host"))
+        self.assertFalse(self.conf.db._has_attr("port"))
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from the_conf import TheConf
+from the_conf.node import ConfNode, LazyNode
+
+
+class TestLazyNodes(TestCase):
+    def setUp(self):
+        self.metaconf = {
+            "parameters": [
+                {
+                    "web": [
+                        {"host": {"type": str, "default": "localhost"}},
+                        {"port": {"type": int}},
+                        {"tls": [{"cert": {"type": str}}]},
+                        {"type": "list", "ports": {"type": int}},
+                    ]
+                },
+                {"worker": [{"count": {"type": int, "among": [1, 2]}}]},
+                {"other": {"type": int, "default": 0}},
+            ],
+            "source_order": ["env"],
+        }
+        self.environ = {
+            "WEB_PORT": "80",
+            "WEB_TLS_CERT": "cert.pem",
+            "WEB_PORTS_0": 1,
+            "OTHER": "3",
+        }
+
+    def test_lazy(self):
+        eager = TheConf(self.metaconf, environ=self.environ)
+        tc = TheConf(self.metaconf, environ=self.environ, lazy=True)
+        self.assertIsInstance(tc._lazy["web"], LazyNode)
+        self.assertEqual(repr(eager), repr(tc))
+        self.assertEqual(eager.freeze(), tc.freeze())
+        self.assertEqual(eager._extract_config(), tc._extract_config())
+        self.assertEqual({"web", "worker"}, set(tc._lazy))
+
+        self.assertEqual(3, tc.other)
+        self.assertEqual(80, tc.web.port)
+        self.assertIsInstance(tc.web, ConfNode)
+        self.assertEqual({"worker"}, set(tc._lazy))
+        self.assertIsInstance(tc.web._lazy["tls"], LazyNode)
+        self.assertEqual("localhost", tc.web.host)
+        self.assertEqual([1], tc.web.ports)
+        self.assertEqual("cert.pem", tc.web.tls.cert)
+        self.assertRaises(AttributeError, getattr, tc.worker, "count")
+        self.assertRaises(AttributeError, getattr, tc, "unknown")
+
+    def test_lazy_set(self):
+        tc = TheConf(self.metaconf, environ={}, lazy=True)
+        tc._set_to_path(["worker", "count"], 2)
+        self.assertRaises(
+            ValueError, tc._set_to_path, ["worker", "count"], 3, True
+        )
+        self.assertIn("worker", tc._lazy)
+        self.assertEqual(2, tc.worker.count)
+        tc._set_to_path(["worker", "count"], 1, overwrite=True)
+        self.assertEqual(1, tc.worker.count)
+
+    def test_lazy_required(self):
+        self.metaconf["parameters"][1]["worker"][0]["count"]["required"] = True
+        self.assertRaises(ValueError, TheConf, self.metaconf, lazy=True)
@@ -1,6 +1,8 @@
 from unittest import TestCase, mock
 
 from the_conf import TheConf
+from the_conf.node import ArrayListNode
+from the_conf.utils import Index
 
 
 class TestListOpts(TestCase):
@@ -368,3 +370,71 @@ class TestListOpts(TestCase):
             assert 5 == tc.intlist[0]
         finally:
             os.unlink(config_file)
+
+    @mock.patch("the_conf.files.read")
+    def test_array_list(self, read_patch):
+        read_patch.return_value = [
+            ("first.json", {"intlist": ["1", 2, 3.0]}),
+            ("second.json", {"intlist": [10], "floatlist": [1, "2.5"]}),
+        ]
+        metaconf = {
+            "parameters": [
+                {"type": "list", "intlist": {"type": int, "storage": "array"}},
+                {
+                    "type": "list",
+                    "floatlist": {"type": float, "storage": "array"},
+                },
+            ],
+            "source_order": ["env", "files"],
+            "config_files": ["first.json", "second.json"],
+        }
+
+        tc = TheConf(metaconf, environ={"FLOATLIST_1": "1.5"})
+        self.assertIsInstance(tc.intlist, ArrayListNode)
+        self.assertEqual([1, 2, 3], tc.intlist)
+        self.assertEqual([1.5], tc.floatlist)
+        self.assertEqual((1, 2, 3), tc.freeze().intlist)
+        self.assertEqual((1.5,), tc.freeze().floatlist)
+        tc.intlist.append("4")
+        tc.intlist[0] = 0
+        self.assertEqual([0, 2, 3, 4], tc.intlist[:])
+        self.assertRaises(ValueError, tc.intlist.__setitem__, 0, "a")
+        self.assertRaises(OverflowError, tc.intlist.append, 2**64)
+        self.assertEqual(
+            [(["intlist", 0], 0), (["intlist", 1], 2)],
+            [(path, value) for path, value, _ in tc._get_path_val_param()][:2],
+        )
+
+    def test_array_list_wrong_type(self):
+        metaconf = {
+            "parameters": [
+                {"type": "list", "strlist": {"type": str, "storage": "array"}}
+            ],
+        }
+        self.assertRaises(ValueError, TheConf, metaconf, environ={})
+
+    def test_complex_list_items_share_settings(self):
+        environ = {f"DICTLIST_{i}_MYINT": str(i) for i in range(3)}
+        metaconf = {
+            "parameters": [
+                {
+                    "type": "list",
+                    "dictlist": [
+                        {"myint": {"type": int}},
+                        {"mystr": {"type": str, "default": "a"}},
+                    ],
+                }
+            ],
+            "source_order": ["env"],
+        }
+        tc = TheConf(metaconf, environ=environ)
+        self.assertEqual([0, 1, 2], [item.myint for item in tc.dictlist])
+        self.assertEqual(["a"] * 3, [item.mystr for item in tc.dictlist])
+        for item in tc.dictlist:
+            self.assertIs(tc.dictlist._parameters, item._parameters)
+            self.assertEqual(["dictlist", Index], item._path)
+        tc.dictlist.append(tc.dictlist._template_node)
+        tc.dictlist[3] = {"myint": "3", "mystr": "b"}
+        self.assertEqual(3, tc.dictlist[3].myint)
+        self.assertEqual("b", tc.dictlist[3].mystr)
+        self.assertRaises(ValueError, setattr, tc.dictlist[3], "myint", "c")
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from the_conf import TheConf, files
+
+
+class TestLoadStats(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "conf.yml")
+        with open(self.path, "w") as fd:
+            fd.write("first: 1\nsecond: 2\nintlist: [1, 2, 3]\n")
+        self.metaconf = {
+            "parameters": [
+                {"first": {"type": int}},
+                {"second": {"type": int}},
+                {"third": {"type": int}},
+                {"type": "list", "intlist": {"type": int}},
+            ],
+            "source_order": ["cmd", "files", "env"],
+            "config_files": [self.path],
+        }
+        files.invalidate_cache()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_stats(self):
+        calls = []
+        tc = TheConf(
+            self.metaconf,
+            cmd_line_opts=["--first=3"],
+            environ={"THIRD": "3", "SECOND": "4"},
+            load_hooks=[lambda *args: calls.append(args)],
+        )
+        stats = tc.load_stats
+        self.assertEqual(
+            ["metaconf", "cmd", "files", "env", "check"], list(stats.phases)
+        )
+        self.assertEqual({"cmd": 1, "files": 5, "env": 2}, stats.values)
+        ((details,),) = [stats.files]
+        self.assertEqual(self.path, details["path"])
+        self.assertEqual(os.stat(self.path).st_size, details["size"])
+        self.assertFalse(details["cached"])
+        self.assertEqual(5, details["values"])
+        for step in "read", "parse", "extract":
+            self.assertGreaterEqual(details["duration"], details[step])
+        self.assertEqual(
+            ["metaconf", "cmd", "file", "files", "env", "check"],
+            [call[0] for call in calls],
+        )
+        self.assertAlmostEqual(
+            stats.total, sum(stats.as_dict()["phases"].values())
+        )
+
+        tc.load()
+        self.assertTrue(stats.files[0]["cached"])
+        self.assertIn("metaconf", stats.phases)
+        self.assertEqual(1, len(stats.files))
+
+    def test_failing_hook(self):
+        def hook(*args):
+            raise RuntimeError()
+
+        with self.assertLogs("the_conf.stats", "ERROR"):
+            tc = TheConf(self.metaconf, environ={}, load_hooks=[hook])
+        self.assertEqual(2, tc.second)
+
+    def test_disabled(self):
+        self.assertIsNone(TheConf(self.metaconf, environ={}).load_stats)
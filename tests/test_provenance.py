@@ -0,0 +1,120 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from the_conf import TheConf, files
+from the_conf.provenance import Origin
+
+
+class TestProvenance(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.config_file = os.path.join(directory.name, "conf.yml")
+        files.write(
+            {
+                "db": {"host": "file-host", "port": 5432},
+                "items": [{"key": "a"}],
+            },
+            self.config_file,
+        )
+        self.conf = TheConf(
+            {
+                "parameters": [
+                    {
+                        "db": [
+                            {"host": {"type": str}},
+                            {"port": {"type": int}},
+                            {"user": {"type": str, "default": "root"}},
+                            {"name": {"type": str}},
+                        ]
+                    },
+                    {"level": {"type": str}},
+                    {
+                        "type": "list",
+                        "ints": {"type": int, "storage": "array"},
+                    },
+                    {"type": "list", "items": [{"key": {"type": str}}]},
+                ],
+                "source_order": ["cmd", "env", "files"],
+                "config_files": [self.config_file],
+            },
+            cmd_line_opts=["--level", "info"],
+            environ={"DB_HOST": "env-host", "INTS_0": "1"},
+            track_origins=True,
+            reloadable=True,
+        )
+
+    def test_origin(self):
+        self.assertEqual(Origin("cmd"), self.conf.origin("level"))
+        self.assertEqual(
+            Origin("env", env="DB_HOST"), self.conf.origin("db.host")
+        )
+        self.assertEqual(
+            Origin("file", file=self.config_file),
+            self.conf.origin(["db", "port"]),
+        )
+        self.assertEqual(Origin("default"), self.conf.origin("db.user"))
+        self.assertIsNone(self.conf.origin("db.name"))
+        self.assertEqual(
+            Origin("env", env="INTS_0"), self.conf.origin("ints.0")
+        )
+        self.assertEqual(Origin("env"), self.conf.origin("ints"))
+        self.assertIsNone(self.conf.origin("db"))
+        self.assertIsNone(self.conf.origin("items.0"))
+        self.assertEqual(
+            Origin("file", file=self.config_file), self.conf.origin("items")
+        )
+        self.assertIsNone(self.conf.origin("ints.1"))
+        self.assertEqual(
+            Origin("file", file=self.config_file),
+            self.conf.origin("items.0.key"),
+        )
+
+        self.conf.db.port = 1234
+        self.assertEqual(Origin("set"), self.conf.origin("db.port"))
+        del self.conf.db.port
+        self.assertIsNone(self.conf.origin("db.port"))
+
+    def test_origins(self):
+        self.assertEqual(
+            {
+                "level": Origin("cmd"),
+                "db.host": Origin("env", env="DB_HOST"),
+                "db.port": Origin("file", file=self.config_file),
+                "db.user": Origin("default"),
+                "ints.0": Origin("env", env="INTS_0"),
+                "items.0.key": Origin("file", file=self.config_file),
+            },
+            self.conf.origins(),
+        )
+
+    def test_reload(self):
+        self.conf.db.port = 1234
+        self.conf.level = "debug"
+        self.conf.db.user = "admin"
+        files.write({"db": {"port": 1}, "level": "warning"}, self.config_file)
+        self.conf.reload()
+        self.assertEqual(
+            Origin("file", file=self.config_file), self.conf.origin("db.port")
+        )
+        self.assertEqual("info", self.conf.level)
+        self.assertEqual(Origin("cmd"), self.conf.origin("level"))
+        self.assertEqual(Origin("set"), self.conf.origin("db.user"))
+        self.assertIsNone(self.conf.origin("items.0.key"))
+
+    def test_not_reloadable(self):
+        conf = TheConf(
+            {"parameters": [{"level": {"type": str}}]},
+            cmd_line_opts=["--level", "info"],
+            track_origins=True,
+        )
+        self.assertEqual({}, conf._sources)  # only kept for reload
+        self.assertEqual(Origin("cmd"), conf.origin("level"))
+
+    def test_untracked(self):
+        conf = TheConf(
+            {"parameters": [{"name": {"type": str}}]}, cmd_line_opts=[]
+        )
+        self.assertIsNone(conf._provenance)
+        self.assertRaises(ValueError, conf.origin, "name")
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from array import array
+from unittest import TestCase, mock
+
+from the_conf import TheConf
+from the_conf.node import ListNode
+
+
+class TestReload(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.first = self.write("first.yml", "option: first\n")
+        self.second = self.write(
+            "second.yml", "option: second\nother: 1\nintlist: [1, 2]\n"
+        )
+        self.metaconf = {
+            "parameters": [
+                {"option": {"type": str}},
+                {"other": {"type": int, "default": 0}},
+                {"env_option": {"type": str}},
+                {"type": "list", "intlist": {"type": int}},
+            ],
+            "source_order": ["env", "files"],
+            "config_files": [self.first, self.second],
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as fd:
+            fd.write(content)
+        return path
+
+    def test_reload(self):
+        tc = TheConf(
+            self.metaconf, environ={"ENV_OPTION": "env"}, reloadable=True
+        )
+        self.assertEqual("first", tc.option)
+        self.assertEqual(1, tc.other)
+        self.assertEqual([1, 2], tc.intlist)
+
+        self.write("second.yml", "option: changed\nintlist: [3]\n")
+        self.assertEqual(
+            {("other",), ("intlist",)}, set(tc.reload([self.second]))
+        )
+        self.assertEqual("first", tc.option)
+        self.assertEqual(0, tc.other)
+        self.assertEqual([3], tc.intlist)
+
+        self.write("first.yml", "env_option: file\nintlist: [4, 5]\n")
+        self.assertEqual({("option",), ("intlist",)}, set(tc.reload()))
+        self.assertEqual("changed", tc.option)
+        self.assertEqual("env", tc.env_option)
+        self.assertEqual([4, 5], tc.intlist)
+
+        os.unlink(self.first)
+        self.assertEqual({("intlist",)}, set(tc.reload()))
+        self.assertEqual([3], tc.intlist)
+        self.assertEqual([], tc.reload())
+
+    def test_not_reloadable(self):
+        tc = TheConf(self.metaconf, environ={})
+        self.assertEqual({}, tc._sources)
+        self.assertRaises(ValueError, tc.reload)
+        self.assertRaises(ValueError, tc.watch)
+
+    def test_records(self):
+        self.metaconf["parameters"].append(
+            {"type": "list", "ints": {"type": int, "storage": "array"}}
+        )
+        self.write("first.yml", "ints: [1, 2, 3]\n")
+        tc = TheConf(self.metaconf, environ={}, reloadable=True)
+        # items of lists are recorded along with their list
+        self.assertEqual(
+            {("option",): "second", ("other",): 1, ("intlist",): [1, 2]},
+            tc._sources[self.second],
+        )
+        self.assertEqual(
+            array("q", [1, 2, 3]), tc._sources[self.first][("ints",)]
+        )
+
+    def test_node_list(self):
+        self.metaconf["parameters"].append(
+            {"type": "list", "items": [{"a": {"type": int}}, {"b": {}}]}
+        )
+        self.write("second.yml", "items: [{a: 1, b: x}]\n")
+        tc = TheConf(self.metaconf, environ={}, reloadable=True)
+        items = tc.items
+        self.write("second.yml", "items: [{a: 3, b: y}, {a: 4, b: z}]\n")
+        # items are swapped at once, the list is never emptied meanwhile
+        with mock.patch.object(ListNode, "clear", side_effect=AssertionError):
+            self.assertEqual([("items",)], tc.reload())
+        self.assertIs(items, tc.items)
+        self.assertEqual(
+            [(3, "y"), (4, "z")], [(item.a, item.b) for item in items]
+        )
+        tc.items[1].a = 5
+        self.assertEqual(5, tc.get("items.1.a"))
+
+    def test_watcher(self):
+        tc = TheConf(self.metaconf, environ={}, reloadable=True)
+        watcher = tc.watch(interval=0.01)
+        try:
+            self.assertIs(watcher, tc.watch())
+            self.write("first.yml", "option: first changed\n")
+            watcher.join(timeout=0.5)
+            self.assertEqual("first changed", tc.option)
+        finally:
+            watcher.stop()
+        self.assertFalse(watcher.is_alive())
+
+    def test_directory(self):
+        conf_d = os.path.join(self.tmp_dir.name, "conf.d")
+        os.mkdir(conf_d)
+        self.write("conf.d/20-other.yml", "option: 20\nother: 20\n")
+        self.write("conf.d/10-base.json", '{"option": "10"}')
+        self.write("conf.d/.hidden.yml", "other: 0\n")
+        self.write("conf.d/notes.txt", "other: 0\n")
+        self.metaconf["config_files"] = [conf_d, self.first]
+        tc = TheConf(self.metaconf, environ={}, reloadable=True)
+        self.assertEqual(("10", 20), (tc.option, tc.other))
+
+        os.unlink(os.path.join(conf_d, "10-base.json"))
+        self.write("conf.d/15-new.yml", "other: 15\n")
+        self.assertEqual({("option",), ("other",)}, set(tc.reload()))
+        self.assertEqual(("20", 15), (tc.option, tc.other))
+
+    def test_colliding_names(self):
+        names = "reload", "watch", "freeze", "flush", "write_behind", "origin"
+        for name in names:
+            with self.assertRaises(ValueError):
+                TheConf({"parameters": [{name: {"type": str}}]}, load=False)
+        # only the root holds those methods
+        tc = TheConf(
+            {
+                "parameters": [
+                    {"db": [{name: {"type": str}} for name in names]}
+                ]
+            },
+            environ={f"DB_{name.upper()}": "value" for name in names},
+            cmd_line_opts=[],
+        )
+        self.assertEqual(["value"] * 6, [tc.db.get(name) for name in names])
@@ -0,0 +1,73 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+import yaml
+
+from the_conf import TheConf, files, node
+
+PASSKEY = "k" * 32
+
+
+class TestSecret(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "conf.yml")
+        with open(self.path, "w") as fd:
+            yaml.dump(
+                {
+                    "password": files.encrypt("s3cr3t", PASSKEY),
+                    "nested": {"pin": files.encrypt("1234", PASSKEY)},
+                    "plain": "value",
+                },
+                fd,
+            )
+        self.metaconf = {
+            "parameters": [
+                {"password": {"type": str, "secret": True}},
+                {"nested": [{"pin": {"type": int, "secret": True}}]},
+                {"plain": {"type": str}},
+            ],
+            "source_order": ["env", "files"],
+            "config_files": [self.path],
+        }
+        self.environ = {"THECONF_PASSKEY": PASSKEY}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lazy_decryption(self):
+        for lazy in False, True:
+            with mock.patch.object(
+                node, "decrypt", wraps=files.decrypt
+            ) as decrypt:
+                tc = TheConf(self.metaconf, environ=self.environ, lazy=lazy)
+                self.assertEqual("value", tc.plain)
+                self.assertEqual(0, decrypt.call_count)
+                self.assertEqual("s3cr3t", tc.password)
+                self.assertEqual("s3cr3t", tc.password)
+                self.assertEqual(1, decrypt.call_count)
+                self.assertEqual(1234, tc.nested.pin)
+                self.assertEqual(2, decrypt.call_count)
+            self.assertNotIn("s3cr3t", repr(tc))
+
+    def test_write(self):
+        tc = TheConf(self.metaconf, environ=self.environ)
+        with mock.patch.object(node, "decrypt") as decrypt:
+            tc.plain = "other"
+            tc.nested.pin = 4321
+            tc.write()
+            decrypt.assert_not_called()
+        # the whole file is encrypted as well, secrets staying encrypted
+        ((_, written),) = files.read([self.path], PASSKEY)
+        self.assertTrue(files.is_encrypted(written["password"]))
+        self.assertEqual(
+            "4321", files.decrypt(written["nested"]["pin"], PASSKEY)
+        )
+        tc = TheConf(self.metaconf, environ=self.environ)
+        self.assertEqual(("s3cr3t", 4321), (tc.password, tc.nested.pin))
+
+    def test_no_passkey(self):
+        tc = TheConf(self.metaconf, environ={})
+        self.assertTrue(files.is_encrypted(tc.password))
+        self.assertFalse(files.is_encrypted("plain;text;here"))
@@ -0,0 +1,99 @@
+import os
+import stat
+from unittest import TestCase, skipUnless
+
+from the_conf import TheConf
+
+
+class TestShared(TestCase):
+    def setUp(self):
+        self.conf = TheConf(
+            {
+                "parameters": [
+                    {"name": {"type": str}},
+                    {"count": {"type": int, "default": 3}},
+                    {"ratio": {"type": float}},
+                    {"flag": {"type": bool, "default": False}},
+                    {"unset": {"type": str}},
+                    {"nested": [{"host": {"type": str}}]},
+                    {
+                        "type": "list",
+                        "ints": {"type": int, "storage": "array"},
+                    },
+                    {"type": "list", "items": [{"key": {"type": str}}]},
+                ],
+                "source_order": ["env"],
+            },
+            environ={
+                "NAME": "é" * 3,
+                "RATIO": "0.5",
+                "NESTED_HOST": "localhost",
+                "INTS_0": "1",
+                "INTS_1": "2",
+                "ITEMS_0_KEY": "a",
+                "ITEMS_1_KEY": "b",
+            },
+        )
+        self.path = self.conf.to_shared()
+        self.addCleanup(os.unlink, self.path)
+
+    def test_from_shared(self):
+        node = TheConf.from_shared(self.path)
+        self.assertEqual("ééé", node.name)
+        self.assertEqual((3, 0.5, False), (node.count, node.ratio, node.flag))
+        self.assertEqual("localhost", node.nested.host)
+        self.assertEqual((1, 2), node.ints)
+        self.assertEqual(["a", "b"], [item.key for item in node.items])
+        self.assertFalse(hasattr(node, "unset"))
+        self.assertIs(node.nested, node.nested)
+        self.assertRaises(AttributeError, setattr, node, "name", "other")
+        self.assertIn("ints=(1, 2)", repr(node))
+
+    def test_file_path(self):
+        path = os.path.join(os.path.dirname(self.path), "conf.snapshot")
+        self.addCleanup(os.unlink, path)
+        self.assertEqual(path, self.conf.to_shared(path))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+        self.assertEqual("localhost", TheConf.from_shared(path).nested.host)
+        with open(path, "wb") as fd:
+            fd.write(b"not a snapshot")
+        self.assertRaises(ValueError, TheConf.from_shared, path)
+
+    def test_secret(self):
+        passkey = "a" * 32
+        metaconf = {
+            "parameters": [
+                {"password": {"type": str, "secret": True}},
+                {"pin": {"type": int, "secret": True}},
+            ],
+            "source_order": ["env"],
+        }
+        environ = {"PASSWORD": "hunter2-password", "PIN": "1234"}
+        conf = TheConf(metaconf, environ=environ)
+        self.assertRaises(ValueError, conf.to_shared)
+
+        environ["THECONF_PASSKEY"] = passkey
+        path = TheConf(metaconf, environ=environ).to_shared()
+        self.addCleanup(os.unlink, path)
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+        with open(path, "rb") as fd:
+            self.assertNotIn(b"hunter2", fd.read())
+        node = TheConf.from_shared(path, passkey)
+        self.assertEqual(("hunter2-password", 1234), (node.password, node.pin))
+        self.assertRaises(
+            ValueError, getattr, TheConf.from_shared(path), "pin"
+        )
+
+    @skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_fork(self):
+        node = TheConf.from_shared(self.path)
+        read, write = os.pipe()
+        pid = os.fork()
+        if not pid:  # worker
+            os.close(read)
+            os.write(write, node.nested.host.encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read, "rb") as fd:
+            self.assertEqual(b"localhost", fd.read())
+        os.waitpid(pid, 0)
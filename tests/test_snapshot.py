@@ -0,0 +1,168 @@
+import os
+import stat
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from the_conf import TheConf, files
+from the_conf.provenance import Origin
+
+METACONF = {
+    "parameters": [
+        {"name": {"type": str}},
+        {"count": {"type": int, "default": 3}},
+        {"nested": [{"host": {"type": str}}]},
+        {"type": "list", "ints": {"type": int, "storage": "array"}},
+        {"type": "list", "items": [{"key": {"type": str}}]},
+        {"token": {"type": str, "secret": True}},
+    ],
+    "source_order": ["env", "files"],
+}
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot = os.path.join(directory.name, "conf.snap")
+        self.config_file = os.path.join(directory.name, "conf.yml")
+        files.write(
+            {"name": "from file", "items": [{"key": "a"}, {"key": "b"}]},
+            self.config_file,
+        )
+        self.environ = {
+            "NESTED_HOST": "localhost",
+            "INTS_0": "1",
+            "INTS_1": "2",
+            "THECONF_PASSKEY": "a" * 32,
+            "TOKEN": files.encrypt("s3cr3t", "a" * 32),
+        }
+
+    def load(self, **kwargs):
+        kwargs.setdefault("environ", self.environ)
+        return TheConf.load_snapshot(
+            self.snapshot,
+            dict(METACONF, config_files=[self.config_file]),
+            **kwargs,
+        )
+
+    def assertLoaded(self, conf, name="from file"):
+        self.assertEqual(name, conf.name)
+        self.assertEqual(3, conf.count)
+        self.assertEqual("localhost", conf.nested.host)
+        self.assertEqual([1, 2], list(conf.ints))
+        self.assertEqual(["a", "b"], [item.key for item in conf.items])
+        self.assertEqual("s3cr3t", conf.token)
+
+    def test_load_snapshot(self):
+        self.assertLoaded(self.load())
+        self.assertTrue(os.path.exists(self.snapshot))
+        with patch.object(TheConf, "load") as load:
+            conf = self.load(load_stats=True)
+        load.assert_not_called()
+        self.assertLoaded(conf)
+        self.assertFalse(conf._has_attr("count"))
+        self.assertEqual([self.config_file], conf._config_files)
+        self.assertIn("snapshot", conf.load_stats.phases)
+
+        conf.name = "written"
+        conf.write()
+        self.assertEqual(
+            "written",
+            list(files.read([self.config_file], "a" * 32))[0][1]["name"],
+        )
+
+    def test_origins_reload(self):
+        self.load(track_origins=True, reloadable=True)
+        with patch.object(TheConf, "load") as load:
+            conf = self.load(track_origins=True, reloadable=True)
+        load.assert_not_called()
+        self.assertEqual(Origin("env"), conf.origin("ints"))
+        self.assertEqual(
+            Origin("file", file=self.config_file), conf.origin("name")
+        )
+        files.write({"name": "changed"}, self.config_file)
+        self.assertEqual({("name",), ("items",)}, set(conf.reload()))
+        self.assertEqual("changed", conf.name)
+        # snapshots of reloadable confs hold records others don't
+        self.load(reloadable=True)
+        with patch.object(TheConf, "load") as load:
+            self.load()
+        load.assert_called_once()
+
+    def test_encrypted(self):
+        files.write(
+            {
+                "name": "from encrypted file",
+                "items": [{"key": "a"}, {"key": "b"}],
+            },
+            self.config_file,
+            passkey="a" * 32,
+        )
+        self.assertLoaded(self.load(), "from encrypted file")
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.snapshot).st_mode))
+        with open(self.snapshot, "rb") as fd:
+            payload = fd.read()
+        self.assertTrue(payload.startswith(files.STREAM_MAGIC))
+        self.assertNotIn(b"from encrypted file", payload)
+        with patch.object(TheConf, "load") as load:
+            self.assertLoaded(self.load(), "from encrypted file")
+        load.assert_not_called()
+        del self.environ["THECONF_PASSKEY"]
+        with self.assertLogs("the_conf.snapshot", "WARNING"):
+            with patch.object(TheConf, "load") as load:
+                self.load()
+        load.assert_called_once()
+
+    def test_outdated(self):
+        self.load()
+        files.write({"name": "changed"}, self.config_file)
+        with patch.object(TheConf, "load", autospec=True) as load:
+            self.load()
+        load.assert_called_once()
+
+        self.environ["INTS_2"] = "3"
+        conf = self.load()
+        self.assertEqual([1, 2, 3], list(conf.ints))
+        self.assertEqual("changed", conf.name)
+        with patch.object(TheConf, "load") as load:
+            self.assertEqual([1, 2, 3], list(self.load().ints))
+        load.assert_not_called()
+
+    def test_config_files_changed(self):
+        self.load()
+        other_file = self.config_file + ".other.yml"
+        files.write(
+            {"name": "from other", "items": [{"key": "a"}, {"key": "b"}]},
+            other_file,
+        )
+        conf = TheConf.load_snapshot(
+            self.snapshot,
+            dict(METACONF, config_files=[other_file]),
+            environ=self.environ,
+        )
+        self.assertLoaded(conf, "from other")
+        self.assertEqual([other_file], conf._config_files)
+
+    def test_unusable(self):
+        with open(self.snapshot, "wb") as fd:
+            fd.write(b"garbage")
+        with self.assertLogs("the_conf.snapshot", "WARNING"):
+            self.assertLoaded(self.load())
+        with patch.object(TheConf, "load") as load:
+            self.assertLoaded(self.load())
+        load.assert_not_called()
+
+    def test_bool_default(self):
+        def load():
+            return TheConf.load_snapshot(
+                self.snapshot,
+                {"parameters": [{"debug": {"type": bool, "default": False}}]},
+                cmd_line_opts=[],
+                environ={},
+            )
+
+        self.assertFalse(load().debug)
+        with patch.object(TheConf, "load") as load_:
+            self.assertFalse(load().debug)
+        load_.assert_not_called()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from the_conf import TheConf, node
+from the_conf.utils import NoValue
+
+
+class TestSubscription(TestCase):
+    def setUp(self):
+        self.metaconf = {
+            "parameters": [
+                {"db": [{"host": {"type": str}}, {"port": {"default": 1}}]},
+                {"other": {"type": int, "default": 0}},
+                {"type": "list", "intlist": {"type": int}},
+            ],
+            "source_order": ["files"],
+        }
+        self.calls = []
+
+    def callback(self, changes):
+        self.calls.append(changes)
+
+    def test_subscribe(self):
+        tc = TheConf(self.metaconf)
+        subscription = tc.subscribe("db", self.callback)
+        tc.db.subscribe("port", self.callback)
+        tc.other = 1
+        self.assertEqual([], self.calls)
+        tc.db.host = "localhost"
+        self.assertEqual(
+            [{("db", "host"): (NoValue, "localhost")}], self.calls
+        )
+        self.calls.clear()
+        tc.db.port = "1"
+        self.assertEqual([], self.calls)
+        tc.db.port = "2"
+        self.assertEqual([{("db", "port"): (1, 2)}] * 2, self.calls)
+        self.calls.clear()
+        subscription.cancel()
+        del tc.db.port
+        self.assertEqual([{("db", "port"): (2, 1)}], self.calls)
+
+    def test_transaction(self):
+        tc = TheConf(self.metaconf)
+        tc.subscribe("", self.callback)
+        with tc.transaction():
+            tc.db.host = "a"
+            tc.db.host = "b"
+            tc.other = 2
+            tc.other = 0
+            self.assertEqual([], self.calls)
+        self.assertEqual([{("db", "host"): (NoValue, "b")}], self.calls)
+
+    def test_reload(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conf.yml")
+            with open(path, "w") as fd:
+                fd.write("other: 1\nintlist: [1]\n")
+            self.metaconf["config_files"] = [path]
+            tc = TheConf(self.metaconf, reloadable=True)
+            tc.subscribe("intlist.0", self.callback)
+            tc.subscribe("other", self.callback)
+            with open(path, "w") as fd:
+                fd.write("other: 2\nintlist: [1, 2]\ndb: {host: a}\n")
+            tc.reload()
+        self.assertEqual(
+            [{("intlist",): ((1,), (1, 2))}, {("other",): (1, 2)}],
+            sorted(self.calls, key=len),
+        )
+
+    def test_lists(self):
+        self.metaconf["parameters"].extend(
+            [
+                {"type": "list", "items": [{"a": {"type": int}}]},
+                {
+                    "type": "list",
+                    "intarray": {"type": int, "storage": "array"},
+                },
+            ]
+        )
+        tc = TheConf(self.metaconf)
+        tc.items[:] = [{"a": 1}]
+        tc.intlist.append(4)
+        tc.subscribe("items", self.callback)
+        tc.subscribe("intlist.0", self.callback)
+        tc.subscribe("intarray", self.callback)
+        tc.items[0].a = 2
+        tc.set("items.0.a", 3)
+        tc.intlist[0] = 5
+        tc.intlist.append(6)
+        tc.intarray += [1, 2]
+        with tc.transaction():
+            tc.intlist.pop()
+            del tc.items[0].a
+        item = [node._frozen_class(("a",))(a=a) for a in (1, 2, 3)]
+        self.assertEqual(
+            [
+                {("items",): ((item[0],), (item[1],))},
+                {("items",): ((item[1],), (item[2],))},
+                {("intlist",): ((4,), (5,))},
+                {("intlist",): ((5,), (5, 6))},
+                {("intarray",): ((), (1, 2))},
+                {("items",): ((item[2],), (node._frozen_class(("a",))(),))},
+                {("intlist",): ((5, 6), (5,))},
+            ],
+            self.calls,
+        )
+
+    def test_debounce_executor(self):
+        tc = TheConf(self.metaconf)
+        with ThreadPoolExecutor(1) as executor:
+            tc.subscribe(
+                "other", self.callback, debounce=0.05, executor=executor
+            )
+            for value in range(1, 10):
+                tc.other = value
+            time.sleep(0.2)
+        self.assertEqual([{("other",): (0, 9)}], self.calls)
+
+    def test_colliding_names(self):
+        for name in "transaction", "subscribe":
+            with self.assertRaises(ValueError):
+                TheConf(
+                    {"parameters": [{"db": [{name: {"type": str}}]}]},
+                    load=False,
+                )
+        tc = TheConf(
+            {"parameters": [{"db": [{"subscription": {"type": str}}]}]},
+            environ={"DB_SUBSCRIPTION": "value"},
+            cmd_line_opts=[],
+        )
+        self.assertEqual("value", tc.db.subscription)
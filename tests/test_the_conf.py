@@ -1,6 +1,7 @@
 from unittest import TestCase, mock
 
 from the_conf import TheConf
+from the_conf.utils import Index
 
 
 class TestTheConfObj(TestCase):
@@ -273,3 +274,101 @@ class TestTheConfObj(TestCase):
         finally:
             os.unlink(first_file)
             os.unlink(second_file)
+
+    def test_schema_index(self):
+        metaconf = {
+            "parameters": [
+                {"option": [{"option": {"type": str, "default": "a"}}]},
+                {"type": "list", "intlist": {"type": int}},
+                {"other": {"type": int}},
+            ],
+            "source_order": ["env"],
+        }
+        tc = TheConf(metaconf, environ={"INTLIST_0": 0, "OTHER": "1"})
+        self.assertEqual(
+            [("option", "option"), ("intlist", Index), ("other",)],
+            list(tc._schema),
+        )
+        self.assertIs(tc.option, tc._schema[("option", "option")][1])
+        self.assertEqual(
+            [
+                (["option", "option"], "a"),
+                (["intlist", 0], 0),
+                (["other"], 1),
+            ],
+            [(path, value) for path, value, _ in tc._get_path_val_param()],
+        )
+
+    def test_freeze(self):
+        metaconf = {
+            "parameters": [
+                {"option": [{"option": {"type": str, "default": "a"}}]},
+                {"type": "list", "intlist": {"type": int}},
+                {"other": {"type": int}},
+                {"unset": {"type": int}},
+            ],
+            "source_order": ["env"],
+        }
+        tc = TheConf(metaconf, environ={"INTLIST_0": 1, "OTHER": "2"})
+        frozen = tc.freeze()
+        self.assertEqual("a", frozen.option.option)
+        self.assertEqual((1,), frozen.intlist)
+        self.assertEqual(2, frozen.other)
+        self.assertRaises(AttributeError, getattr, frozen, "unset")
+        self.assertRaises(AttributeError, setattr, frozen, "other", 3)
+        self.assertRaises(AttributeError, setattr, frozen, "new", 3)
+        self.assertFalse(hasattr(frozen, "__dict__"))
+        tc.other = 3
+        self.assertEqual(2, frozen.other)
+
+    def test_freeze_names(self):
+        import os
+
+        metaconf = {
+            "parameters": [
+                {"log-level": {"type": str, "default": "info"}},
+                {"type": "list", "items": [{"log-level": {"type": str}}]},
+            ],
+            "source_order": ["env"],
+        }
+        tc = TheConf(metaconf, environ={})
+        frozen = tc.freeze()
+        self.assertEqual("info", getattr(frozen, "log-level"))
+        self.assertEqual((), frozen.items)
+        self.assertEqual(frozen, tc.freeze())
+        self.assertIn("log-level='info'", repr(frozen))
+        self.assertRaises(AttributeError, setattr, frozen, "log-level", "")
+        path = tc.to_shared()
+        self.addCleanup(os.unlink, path)
+        shared = TheConf.from_shared(path)
+        self.assertEqual("info", getattr(shared, "log-level"))
+        calls = []
+        tc.subscribe("items", calls.append)
+        tc.items[:] = [{"log-level": "debug"}]
+        (item,) = calls[0][("items",)][1]
+        self.assertEqual("debug", getattr(item, "log-level"))
+
+    def test_write(self):
+        import tempfile
+        import os
+
+        metaconf = {
+            "parameters": [
+                {"nested": [{"a": {"default": 1}}, {"b": {"type": int}}]},
+                {"type": "list", "intlist": {"type": int}},
+                {"other": {"type": str}},
+            ],
+            "source_order": ["env", "files"],
+        }
+        environ = {"NESTED_A": "2", "NESTED_B": "3", "INTLIST_0": 4}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conf.json")
+            metaconf["config_files"] = [path]
+            tc = TheConf(metaconf, environ=environ)
+            self.assertTrue(tc.write())
+            self.assertFalse(tc.write())
+            tc = TheConf(metaconf, environ={})
+            self.assertEqual(
+                {"nested": {"a": 2, "b": 3}, "intlist": [4]},
+                tc._extract_config(),
+            )
@@ -0,0 +1,117 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+import yaml
+
+from the_conf import TheConf, files
+
+
+class TestWriteBehind(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "conf.yml")
+        with open(self.path, "w") as fd:
+            fd.write("counter: 0\nnode:\n  option: a\n")
+        self.metaconf = {
+            "parameters": [
+                {"counter": {"type": int}},
+                {"node": [{"option": {"type": str}}]},
+                {"type": "list", "intlist": {"type": int}},
+            ],
+            "source_order": ["files"],
+            "config_files": [self.path],
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self):
+        with open(self.path) as fd:
+            return yaml.safe_load(fd)
+
+    def test_untouched_keys_reused(self):
+        tc = TheConf(self.metaconf)
+        tc.write()
+        serialized = tc._serialized
+        tc.counter = 1
+        with mock.patch.object(
+            tc, "_extract_config", wraps=tc._extract_config
+        ) as extract:
+            tc.write()
+        extract.assert_called_once_with({"counter", "intlist"})
+        self.assertIs(serialized["node"], tc._serialized["node"])
+        self.assertEqual({"counter": 1, "node": {"option": "a"}}, self.read())
+
+        tc.node.option = "b"
+        tc.intlist.append(2)
+        del tc.counter
+        tc.write()
+        self.assertEqual(
+            {"node": {"option": "b"}, "intlist": [2]}, self.read()
+        )
+
+    def test_write_behind(self):
+        tc = TheConf(self.metaconf)
+        with mock.patch.object(files, "write", wraps=files.write) as write:
+            flusher = tc.write_behind(interval=60)
+            for i in range(1000):
+                tc.counter = i
+            tc.node.option = "b"
+            self.assertEqual(0, self.read()["counter"])
+            self.assertTrue(flusher.pending)
+            self.assertTrue(tc.flush())
+            self.assertFalse(flusher.pending)
+            self.assertEqual(1, write.call_count)
+            self.assertEqual(
+                {"counter": 999, "node": {"option": "b"}}, self.read()
+            )
+
+            tc.counter = 1000
+            flusher.stop()
+        self.assertFalse(flusher.is_alive())
+        self.assertEqual(2, write.call_count)
+        self.assertEqual(1000, self.read()["counter"])
+
+    def test_lists(self):
+        self.metaconf["parameters"].append(
+            {"type": "list", "ints": {"type": int, "storage": "array"}}
+        )
+        tc = TheConf(self.metaconf)
+        flusher = tc.write_behind(interval=60)
+        tc.intlist.append(8080)
+        self.assertTrue(flusher.pending)
+        self.assertTrue(tc.flush())
+        tc.ints._set_items([(0, 1)])
+        self.assertTrue(flusher.pending)
+        tc.flush()
+        tc.ints.append(2)
+        flusher.stop()
+        self.assertEqual([8080], self.read()["intlist"])
+        self.assertEqual([1, 2], self.read()["ints"])
+
+    def test_marked_once_set(self):
+        tc = TheConf(self.metaconf)
+        tc.write_behind(interval=60)
+
+        def mark_dirty(key):
+            # a flush happening now has to see the new value
+            self.assertEqual(1, tc.counter)
+            return mark(key)
+
+        mark = tc._mark_dirty
+        with mock.patch.object(tc, "_mark_dirty", side_effect=mark_dirty):
+            tc.counter = 1
+        tc._flusher.stop()
+        self.assertEqual(1, self.read()["counter"])
+
+    def test_write_behind_timer(self):
+        tc = TheConf(self.metaconf)
+        flusher = tc.write_behind(interval=0.01)
+        tc.counter = 42
+        flusher.join(0.2)
+        try:
+            self.assertFalse(flusher.pending)
+            self.assertEqual(42, self.read()["counter"])
+        finally:
+            flusher.stop()
@@ -1,39 +1,117 @@
+import glob
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os.path import expanduser
+
 from . import TheConf, files
 
 metaconf = {
     "source_order": ["cmd"],
     "parameters": [
-        {"mode": {"type": str, "among": ["encrypt", "decrypt"]}},
+        {"mode": {"type": str, "among": ["encrypt", "decrypt", "rotate"]}},
         {
             "file": {
                 "required": True,
                 "type": str,
-                "help": "path to the file to encrypt or decrypt",
+                "help_txt": "paths or glob patterns, comma separated, of the "
+                "files to encrypt or decrypt",
             }
         },
         {
             "key": {
                 "required": True,
                 "type": str,
-                "help": "the pass key to encrypt or decrypt file",
+                "help_txt": "the pass key to encrypt or decrypt file",
+            }
+        },
+        {
+            "new_key": {
+                "type": str,
+                "help_txt": "the pass key to encrypt files with in rotate "
+                "mode",
             }
         },
         {"encoding": {"default": "utf8"}},
+        {
+            "workers": {
+                "default": 0,
+                "help_txt": "number of processes, as many as CPUs by default",
+            }
+        },
     ],
 }
-cmdline = TheConf(metaconf)
 
 
-def main():
-    with open(cmdline.file, "r", encoding=cmdline.encoding) as fd:
-        if cmdline.mode == "decrypt":
-            content = files.decrypt(fd.read(), cmdline.key)
+def expand(patterns):
+    """Return the files matching the comma separated patterns, unmatched
+    patterns being kept as is for their failure to be reported."""
+    paths = {}
+    for pattern in patterns.split(","):
+        pattern = expanduser(pattern.strip())
+        if pattern:
+            for path in sorted(glob.glob(pattern, recursive=True)) or [
+                pattern
+            ]:
+                paths[path] = None
+    return list(paths)
+
+
+def process(path, mode, key, new_key=None, encoding="utf8"):
+    """Encrypt, decrypt or re-encrypt path, replacing it atomically.
+    Return the path, the time spent on it and the error if any."""
+    start = time.perf_counter()
+    try:
+        with open(path, "r", encoding=encoding) as fd:
+            if mode == "encrypt":
+                content = fd.read()
+            elif files.is_stream_encrypted(fd.buffer):
+                content = files.open_decrypted(fd.buffer, key).read()
+            else:
+                content = files.decrypt(fd.read(), key)
+        if mode == "decrypt":
+            files.write_atomic(path, content.encode(encoding))
         else:
-            content = files.encrypt(fd.read(), cmdline.key)
+            files.write_atomic(
+                path, content, new_key if mode == "rotate" else key
+            )
+    except Exception as error:
+        return path, time.perf_counter() - start, f"{error!r}"
+    return path, time.perf_counter() - start, None
+
+
+def main(argv=None):
+    cmdline = TheConf(metaconf, cmd_line_opts=argv)
+    new_key = getattr(cmdline, "new_key", None)
+    if cmdline.mode == "rotate" and not new_key:
+        print("rotate mode requires --new_key", file=sys.stderr)
+        return 2
+    paths = expand(cmdline.file)
+    args = cmdline.mode, cmdline.key, new_key, cmdline.encoding
+
+    start = time.perf_counter()
+    if len(paths) == 1 or cmdline.workers == 1:
+        results = [process(path, *args) for path in paths]
+    else:
+        with ProcessPoolExecutor(cmdline.workers or None) as executor:
+            results = list(
+                executor.map(
+                    process, paths, *([arg] * len(paths) for arg in args)
+                )
+            )
+    elapsed = time.perf_counter() - start
 
-    with open(cmdline.file, "w", encoding=cmdline.encoding) as fd:
-        fd.write(content)
+    failures = [(path, error) for path, _, error in results if error]
+    for path, error in failures:
+        print(f"{path}: {error}", file=sys.stderr)
+    print(
+        f"{cmdline.mode}: {len(results)} file(s) in {elapsed:.3f}s "
+        f"({sum(result[1] for result in results):.3f}s of work), "
+        f"{len(failures)} failed",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
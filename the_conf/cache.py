@@ -0,0 +1,137 @@
+"""On-disk cache of compiled metaconfs.
+
+Compiling a metaconf means parsing its file and building the whole node tree
+out of it. Both only depend on the content of the metaconf files and on the
+version of the library, so the result of that compilation is pickled, keyed
+on a hash of those, and simply unpickled on later starts.
+"""
+import hashlib
+import logging
+import os
+import pickle
+from importlib import metadata
+from os.path import abspath, expanduser, join
+from tempfile import NamedTemporaryFile
+from typing import Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+CACHE_FORMAT = 2
+ROOT_ID = "root"
+COMPILED_ATTRS = (
+    "_source_order",
+    "_config_files",
+    "_config_file_cmd_line",
+    "_config_file_environ",
+    "_passkey_cmd_line",
+    "_passkey_environ",
+    "_backends",
+    "_parameters",
+    "_children",
+    "_schema",
+)
+
+
+def get_version() -> str:
+    try:
+        return metadata.version("the_conf")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_cache_dir(cache_dir: Union[bool, str]) -> str:
+    if isinstance(cache_dir, str):
+        return abspath(expanduser(cache_dir))
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or expanduser("~/.cache")
+    return join(xdg_cache, "the_conf")
+
+
+def get_cache_path(
+    metaconfs: Iterable[str], cache_dir: Union[bool, str], lazy: bool = False
+) -> Optional[str]:
+    """Return the path the compilation of metaconfs is to be cached at, None
+    if one of them can't be read.
+    """
+    digest = hashlib.sha256(
+        f"{CACHE_FORMAT}:{get_version()}:{lazy:d}".encode()
+    )
+    for metaconf in metaconfs:
+        try:
+            with open(abspath(expanduser(metaconf.strip())), "rb") as fd:
+                content = fd.read()
+        except OSError:
+            return None
+        digest.update(hashlib.sha256(content).digest())
+    return join(get_cache_dir(cache_dir), f"{digest.hexdigest()}.pickle")
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, fd, root):
+        super().__init__(fd, protocol=pickle.HIGHEST_PROTOCOL)
+        self._root = root
+
+    def persistent_id(self, obj):
+        # the root node is the instance being built, not a part of the cache
+        return ROOT_ID if obj is self._root else None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, fd, root):
+        super().__init__(fd)
+        self._root = root
+
+    def persistent_load(self, pid):
+        if pid != ROOT_ID:
+            raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+        return self._root
+
+
+def dump(path: str, root) -> None:
+    """Store the compiled schema of root at path, root being referenced
+    symbolically so that any other instance can be plugged in at load time.
+    """
+    state = {attr: getattr(root, attr) for attr in COMPILED_ATTRS}
+    state["nodes"] = {
+        child: getattr(root, child)
+        for child in root._children
+        if root._has_attr(child)
+    }
+    state["lazy"] = root.__dict__.get("_lazy", {})
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with NamedTemporaryFile(
+            "wb", dir=os.path.dirname(path), delete=False
+        ) as fd:
+            tmp_path = fd.name
+            _Pickler(fd, root).dump(state)
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError):
+        logger.warning("couldn't write metaconf cache %r", path, exc_info=True)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+def load(path: str, root) -> bool:
+    """Plug the compiled schema cached at path into root, return False if
+    there was nothing usable to load.
+    """
+    try:
+        with open(path, "rb") as fd:
+            state = _Unpickler(fd, root).load()
+    except FileNotFoundError:
+        return False
+    except Exception:
+        logger.warning(
+            "ignoring unusable metaconf cache %r", path, exc_info=True
+        )
+        return False
+    for child, node in state.pop("nodes").items():
+        setattr(root, child, node)
+    if state["lazy"]:
+        root._lazy = state["lazy"]
+    for attr in COMPILED_ATTRS:
+        setattr(root, attr, state[attr])
+    return True
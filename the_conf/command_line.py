@@ -1,3 +1,5 @@
+import sys
+from functools import lru_cache
 from typing import Union, Tuple, Set, List
 from argparse import ArgumentParser
 
@@ -5,6 +7,7 @@ from the_conf.utils import Index
 
 CONFIG_OPT_DEST = "config_file_path"
 PASSKEY_OPT_DEST = "passkey"
+HELP_OPTS = ("-h", "--help")
 OPTS_TYPE = Union[Tuple[str, ...], List[str], Set[str]]
 
 
@@ -16,20 +19,10 @@ def path_to_dest(path):
     return "_".join(path)
 
 
-def get_parser(
-    path_n_params, config_file_cmd_line: OPTS_TYPE, passkey_cmd_line: OPTS_TYPE
-):
-    parser = ArgumentParser()
-    parser.add_argument(
-        *config_file_cmd_line,
-        dest=CONFIG_OPT_DEST,
-        help="set main conf file to load configuration from",
-    )
-    parser.add_argument(
-        *passkey_cmd_line,
-        dest=PASSKEY_OPT_DEST,
-        help="set main conf file to load configuration from",
-    )
+def get_arguments(path_n_params):
+    """Return the arguments to build the parser with as a hashable tuple of
+    (flag, dest, sorted keyword arguments)."""
+    arguments = []
     for path, _, param in path_n_params:
         parser_kw = {}
 
@@ -44,19 +37,66 @@ def get_parser(
             else path_to_cmd_opt(path)
         )
 
-        if "type" in param:
+        if "type" in param:  # compiled settings are left untouched
             parser_kw["type"] = param["type"]
-            if param["type"] is bool and param.get("default") is False:
-                param["action"], param["default"] = "store_true", False
-            elif param["type"] is bool and param.get("default") is True:
-                param["action"], param["default"] = "store_false", True
         if "among" in param:
-            parser_kw["choices"] = param["among"]
+            parser_kw["choices"] = tuple(param["among"])
         if "help_txt" in param:
             parser_kw["help"] = param["help_txt"]
 
-        parser.add_argument(flag, dest=path_to_dest(path), **parser_kw)
-    return parser
+        arguments.append(
+            (flag, path_to_dest(path), tuple(sorted(parser_kw.items())))
+        )
+    return tuple(arguments)
+
+
+@lru_cache(maxsize=32)
+def _build_parser(
+    arguments, config_file_cmd_line: tuple, passkey_cmd_line: tuple
+):
+    parser = ArgumentParser()
+    parser.add_argument(
+        *config_file_cmd_line,
+        dest=CONFIG_OPT_DEST,
+        help="set main conf file to load configuration from",
+    )
+    parser.add_argument(
+        *passkey_cmd_line,
+        dest=PASSKEY_OPT_DEST,
+        help="set main conf file to load configuration from",
+    )
+    flags = set(HELP_OPTS) | set(config_file_cmd_line) | set(passkey_cmd_line)
+    for flag, dest, parser_kw in arguments:
+        parser.add_argument(flag, dest=dest, **dict(parser_kw))
+        flags.add(flag)
+    return parser, frozenset(flags)
+
+
+def get_parser(
+    path_n_params, config_file_cmd_line: OPTS_TYPE, passkey_cmd_line: OPTS_TYPE
+):
+    """Return the parser for the given parameters, parsers being built only
+    once for a given set of arguments."""
+    return _build_parser(
+        get_arguments(path_n_params),
+        tuple(config_file_cmd_line),
+        tuple(passkey_cmd_line),
+    )[0]
+
+
+def has_known_flag(opts, flags) -> bool:
+    """Tell if opts may hold one of flags, abbreviations of long options and
+    values stuck to short ones included. Errs on the side of caution."""
+    for opt in opts:
+        if opt == "--":
+            break
+        if not opt.startswith("-") or opt == "-":
+            continue
+        opt = opt.split("=", 1)[0]
+        for flag in flags:
+            if flag.startswith(opt) or opt.startswith(flag):
+                return True
+    return False
 
 
 def yield_values_from_cmd(
@@ -65,9 +105,16 @@ def yield_values_from_cmd(
     config_file_cmd_line: OPTS_TYPE,
     passkey_cmd_line: OPTS_TYPE,
 ):
-    parser = get_parser(
-        path_val_params, config_file_cmd_line, passkey_cmd_line
+    parser, flags = _build_parser(
+        get_arguments(path_val_params),
+        tuple(config_file_cmd_line),
+        tuple(passkey_cmd_line),
     )
+    if not has_known_flag(sys.argv[1:] if opts is None else opts, flags):
+        # nothing for us on the command line, sparing argparse
+        yield None
+        yield None
+        return
     cmd_line_args, _ = parser.parse_known_args(opts)
     yield getattr(cmd_line_args, CONFIG_OPT_DEST)
     yield getattr(cmd_line_args, PASSKEY_OPT_DEST)
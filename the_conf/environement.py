@@ -1,9 +1,79 @@
 import re
-from typing import Generator, Tuple
+from typing import Dict, Generator, Iterable, List, Sequence, Tuple
 
 from the_conf.utils import Index, NoValue
 
 
+def path_to_env_key(path) -> str:
+    return "_".join(map(str.upper, path))
+
+
+class EnvironMatcher:
+    """All the paths of a schema compiled into a single matcher.
+
+    Paths without `Index` are looked up through a plain dict, paths
+    describing a value being part of a list are compiled in one alternation
+    regex where each alternative is wrapped in its own group, which allows
+    to find out which path matched and where its indexes are in one go:
+    >>> EnvironMatcher([["eki", Index, "patang"], ["eki", "ki"]])
+    ... {"EKI_KI": ["eki", "ki"]}, r"(EKI_(\\d+)_PATANG)"
+
+    The environ is then scanned once, whatever the number of paths.
+    """
+
+    def __init__(self, paths: Iterable[Sequence]):
+        self._keys: Dict[str, Tuple[int, tuple]] = {}
+        self._groups: Dict[int, Tuple[int, tuple, List[int]]] = {}
+        patterns, group = [], 1
+        for rank, path in enumerate(map(tuple, paths)):
+            if Index not in path:
+                self._keys[path_to_env_key(path)] = rank, path
+                continue
+            indexes_places = [
+                i for i, elem in enumerate(path) if elem is Index
+            ]
+            patterns.append(
+                "(%s)"
+                % "_".join(
+                    r"(\d+)" if elem is Index else re.escape(elem.upper())
+                    for elem in path
+                )
+            )
+            self._groups[group] = rank, path, indexes_places
+            group += len(indexes_places) + 1
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def match(self, environ: dict) -> List[Tuple[tuple, list, str]]:
+        """Return (schema path, actual path, value) for each key of environ
+        matching a path. Results follow the order of the compiled paths and
+        list items are sorted numerically on their indexes.
+        """
+        matches: List[Tuple[Tuple[int, Tuple[int, ...]], tuple, list, str]]
+        matches = []
+        for environ_key, value in environ.items():
+            if environ_key in self._keys:
+                rank, path = self._keys[environ_key]
+                matches.append(((rank, ()), path, list(path), value))
+                continue
+            if self._pattern is None:
+                continue
+            match = self._pattern.fullmatch(environ_key)
+            if match is None or match.lastindex is None:
+                continue
+            group = match.lastindex
+            rank, path, indexes_places = self._groups[group]
+            indexes = tuple(
+                int(match.group(group + i + 1))
+                for i in range(len(indexes_places))
+            )
+            amended_path = list(path)
+            for place, index in zip(indexes_places, indexes):
+                amended_path[place] = index
+            matches.append(((rank, indexes), path, amended_path, value))
+        matches.sort(key=lambda match: match[0])
+        return [match[1:] for match in matches]
+
+
 def iter_on_environ_from_path(
     path: list, environ: dict
 ) -> Generator[Tuple[list, str], None, None]:
@@ -24,31 +94,11 @@ def iter_on_environ_from_path(
     ... "EKI_0_PATANG"
     ... "EKI_1_PATANG"
     ... "EKI_10_PATANG"
+
+    For several paths, prefer compiling them once in an `EnvironMatcher`.
     """
-    if Index not in path:
-        env_key = "_".join(map(str.upper, path))
-        if env_key in environ:
-            yield path, environ[env_key]
-    else:
-        patterns = []
-        indexes_places = []
-        for i, elem in enumerate(path):
-            if elem is Index:
-                patterns.append(r"(\d+)")
-                indexes_places.append(i)
-            else:
-                patterns.append(elem.upper())
-        pattern = r"_".join(patterns)
-        for environ_key in sorted(environ):
-            match = re.match(pattern, environ_key)
-            if match:
-                amended_path = [
-                    elem
-                    if i not in indexes_places
-                    else int(match.groups()[indexes_places.index(i)])
-                    for i, elem in enumerate(path)
-                ]
-                yield amended_path, environ[environ_key]
+    for _, actual_path, value in EnvironMatcher([path]).match(environ):
+        yield actual_path, value
 
 
 def index_to_remove(iterator):
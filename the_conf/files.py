@@ -1,7 +1,23 @@
+import asyncio
+import glob
+import hashlib
+import io
 import json
 import logging
-from os.path import abspath, expanduser, splitext
-from typing import Union, Optional, Tuple, Generator
+import os
+import pickle
+import stat
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from os.path import abspath, basename, dirname, expanduser, realpath
+from os.path import isdir, isfile, join, splitext
+from typing import BinaryIO, Callable, Dict, Union, Optional, Tuple, cast
+from typing import Generator, List
 import yaml
 
 from the_conf.utils import Index
@@ -10,12 +26,107 @@ from base64 import b64decode, b64encode
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 
-# from Crypto.Random import get_random_bytes
-
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 ENCODING = "utf8"
 CRYPT_SEPARATOR = ";"
+# chunked encryption format: a header followed by chunks, each holding its
+# nonce, a flag marking the last one, its length, the data and its tag
+STREAM_MAGIC = b"TCGCM"
+STREAM_VERSION = 1
+STREAM_CHUNK_SIZE = 64 * 1024
+_STREAM_HEADER = struct.Struct(">5sBI")  # magic, version, chunk size
+_CHUNK_HEADER = struct.Struct(">12sBI")  # nonce, is last, data length
+_CHUNK_AAD = struct.Struct(">Q")  # chunk index, against reordering
+_TAG_SIZE = 16
+PARSED_CACHE_SIZE = 128
+READ_WORKERS = 8  # threads config files are read and parsed in
+EXTENSIONS = {"yml": "yaml", "yaml": "yaml", "json": "json"}
+Backend = Tuple[
+    Callable[[Union[str, io.TextIOBase]], object], Callable[[object], str]
+]
+
+
+def _read(payload: Union[str, io.TextIOBase]) -> str:
+    return payload if isinstance(payload, str) else payload.read()
+
+
+# loaders accept either strings or text streams
+BACKENDS: Dict[str, Dict[str, Backend]] = {
+    "yaml": {
+        "yaml": (
+            lambda payload: yaml.load(payload, Loader=yaml.FullLoader),
+            lambda config: yaml.dump(config, Dumper=yaml.Dumper),
+        ),
+    },
+    "json": {"json": (lambda payload: json.loads(_read(payload)), json.dumps)},
+}
+# backends picked by default when available, first is prefered
+PREFERED_BACKENDS = {"yaml": ["libyaml", "yaml"], "json": ["orjson", "json"]}
+if getattr(yaml, "__with_libyaml__", False):
+    BACKENDS["yaml"]["libyaml"] = (
+        lambda payload: yaml.load(payload, Loader=yaml.CSafeLoader),
+        lambda config: yaml.dump(config, Dumper=yaml.CSafeDumper),
+    )
+if orjson is not None:
+    BACKENDS["json"]["orjson"] = (
+        lambda payload: orjson.loads(_read(payload)),
+        lambda config: orjson.dumps(config).decode(ENCODING),
+    )
+
+
+def get_backend(
+    path: str, backends: Optional[Dict[str, str]] = None
+) -> Optional[Backend]:
+    """Return the (loads, dumps) functions to handle path with, None if
+    the file type is unknown.
+
+    backends: a mapping of file type (yaml or json) to the name of the backend
+    to use for it, unavailable backends falling back to the prefered ones.
+    """
+    file_type = EXTENSIONS.get(splitext(path)[1][1:])
+    if file_type is None:
+        return None
+    name = (backends or {}).get(file_type)
+    if name is not None and name not in BACKENDS[file_type]:
+        logger.warning(
+            "%s backend %r is unavailable, falling back", file_type, name
+        )
+        name = None
+    if name is None:
+        name = next(
+            name
+            for name in PREFERED_BACKENDS[file_type]
+            if name in BACKENDS[file_type]
+        )
+    return BACKENDS[file_type][name]
+
+
+@lru_cache(maxsize=16)
+def _get_key(passkey: Union[bytes, str]) -> bytes:
+    """Return the AES key for passkey, computed once per passkey."""
+    if isinstance(passkey, str):
+        passkey = passkey.encode(ENCODING)
+    assert len(passkey) >= 32, "Your passkey is too short"
+    return passkey
+
+
+def is_encrypted(payload, separator: str = CRYPT_SEPARATOR) -> bool:
+    """Tell whether payload looks like the output of encrypt()."""
+    if not isinstance(payload, str) or payload.count(separator) != 2:
+        return False
+    nonce, data, tag = payload.split(separator)
+    try:
+        return bool(data) and (
+            len(b64decode(nonce, validate=True)),
+            len(b64decode(tag, validate=True)),
+        ) == (12, 16)
+    except ValueError:
+        return False
 
 
 def decrypt(
@@ -23,9 +134,7 @@ def decrypt(
     passkey: Union[bytes, str],
     separator: str = CRYPT_SEPARATOR,
 ) -> str:
-    if isinstance(passkey, str):
-        passkey = passkey.encode(ENCODING)
-    assert len(passkey) >= 32, "Your passkey is too short"
+    passkey = _get_key(passkey)
     if payload.count("\n"):
         raise RuntimeError("Couldn't decrypt unencrypted payload")
     try:
@@ -48,9 +157,7 @@ def encrypt(
     passkey: Union[bytes, str],
     separator: str = CRYPT_SEPARATOR,
 ) -> str:
-    if isinstance(passkey, str):
-        passkey = passkey.encode(ENCODING)
-    assert len(passkey) >= 32, "Your passkey is too short"
+    passkey = _get_key(passkey)
     nonce = get_random_bytes(12)
     cipher = AES.new(passkey, AES.MODE_GCM, nonce=nonce)
     data, tag = cipher.encrypt_and_digest(payload.encode(ENCODING))
@@ -63,39 +170,356 @@ def encrypt(
     return separator.join(crypted_payload)
 
 
-def read(
-    paths, passkey: Optional[str] = None
-) -> Generator[Tuple[str, str], None, None]:
-    any_found = False
+def encrypt_stream(
+    payload: Union[bytes, str],
+    passkey: Union[bytes, str],
+    fp: BinaryIO,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> None:
+    """Encrypt payload into fp, chunk by chunk, in the chunked format."""
+    passkey = _get_key(passkey)
+    if isinstance(payload, str):
+        payload = payload.encode(ENCODING)
+    header = _STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, chunk_size)
+    fp.write(header)
+    view = memoryview(payload)
+    buffer = memoryview(bytearray(min(chunk_size, len(view))))
+    offset, index = 0, 0
+    while True:
+        end = offset + chunk_size
+        chunk = view[offset:end]
+        offset += len(chunk)
+        nonce = get_random_bytes(12)
+        chunk_header = _CHUNK_HEADER.pack(
+            nonce, offset >= len(view), len(chunk)
+        )
+        cipher = AES.new(passkey, AES.MODE_GCM, nonce=nonce)
+        cipher.update(header + chunk_header + _CHUNK_AAD.pack(index))
+        data = buffer[: len(chunk)]
+        cipher.encrypt(chunk, output=data)
+        fp.write(chunk_header)
+        fp.write(data)
+        fp.write(cipher.digest())
+        if offset >= len(view):
+            return
+        index += 1
+
+
+class DecryptingReader(io.RawIOBase):
+    """Raw stream decrypting a file in the chunked format on the go, only
+    holding one chunk of it in memory. Chunks are authenticated before any
+    of their content is handed out.
+    """
+
+    def __init__(self, fp: BinaryIO, passkey: Union[bytes, str]):
+        super().__init__()
+        self._fp = fp
+        self._passkey = _get_key(passkey)
+        self._header = self._read(_STREAM_HEADER.size)
+        magic, version, chunk_size = _STREAM_HEADER.unpack(self._header)
+        if magic != STREAM_MAGIC or version != STREAM_VERSION:
+            raise RuntimeError("Couldn't decrypt payload: unknown format")
+        self._data = memoryview(bytearray(chunk_size))
+        self._plain = memoryview(bytearray(chunk_size))
+        self._start = self._end = 0
+        self._index = 0
+        self._finished = False
+
+    def _read(self, size):
+        data = self._fp.read(size)
+        if len(data) != size:
+            raise RuntimeError("Couldn't decrypt truncated payload")
+        return data
+
+    def _read_into(self, buffer):
+        read = 0
+        while read < len(buffer):
+            count = self._fp.readinto(buffer[read:])
+            if not count:
+                raise RuntimeError("Couldn't decrypt truncated payload")
+            read += count
+        return buffer
+
+    def _next_chunk(self):
+        chunk_header = self._read(_CHUNK_HEADER.size)
+        nonce, is_last, length = _CHUNK_HEADER.unpack(chunk_header)
+        if length > len(self._data):
+            raise RuntimeError("Couldn't decrypt payload: corrupted chunk")
+        data = self._read_into(self._data[:length])
+        tag = self._read(_TAG_SIZE)
+        cipher = AES.new(self._passkey, AES.MODE_GCM, nonce=nonce)
+        cipher.update(
+            self._header + chunk_header + _CHUNK_AAD.pack(self._index)
+        )
+        cipher.decrypt(data, output=self._plain[:length])
+        try:
+            cipher.verify(tag)
+        except ValueError as error:
+            raise RuntimeError("Couldn't decrypt payload") from error
+        self._start, self._end = 0, length
+        self._index += 1
+        self._finished = bool(is_last)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._start == self._end:
+            if self._finished:
+                return 0
+            self._next_chunk()
+        start = self._start
+        size = min(len(buffer), self._end - start)
+        self._start = end = start + size
+        buffer[:size] = self._plain[start:end]
+        return size
+
+
+def is_stream_encrypted(fp: io.BufferedReader) -> bool:
+    return fp.peek(len(STREAM_MAGIC))[: len(STREAM_MAGIC)] == STREAM_MAGIC
+
+
+def open_decrypted(
+    fp: BinaryIO, passkey: Union[bytes, str]
+) -> io.TextIOWrapper:
+    """Return a text stream of the decrypted content of fp, a binary file
+    in the chunked format."""
+    return io.TextIOWrapper(
+        io.BufferedReader(DecryptingReader(fp, passkey)), encoding=ENCODING
+    )
+
+
+_parsed_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_parsed_cache_lock = threading.Lock()
+
+
+def invalidate_cache(path: Optional[str] = None) -> None:
+    """Drop parsed payloads of path from the process-wide cache, all of
+    them if no path is given.
+    """
+    with _parsed_cache_lock:
+        if path is None:
+            _parsed_cache.clear()
+            return
+        path = realpath(abspath(expanduser(path.strip())))
+        for key in [key for key in _parsed_cache if key[0] == path]:
+            del _parsed_cache[key]
+
+
+def _get_cache_key(path, passkey, backend) -> Optional[tuple]:
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    if passkey:
+        if isinstance(passkey, str):
+            passkey = passkey.encode(ENCODING)
+        passkey = hashlib.sha256(passkey).hexdigest()
+    return (
+        realpath(path),
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+        passkey,
+        backend,
+    )
+
+
+def _parse(
+    path: str,
+    passkey: Optional[str],
+    backend: Backend,
+    stats: Optional[dict] = None,
+):
+    """Read, decrypt and parse path. Parsed payloads are kept pickled in a
+    bounded process-wide cache, callers always getting their own copy of it
+    (unpickling being way faster than copying, or than parsing again).
+
+    stats: if provided, filled with the size of the file and the time spent
+    reading, decrypting and parsing it.
+    """
+    key = _get_cache_key(path, passkey, backend)
+    if stats is not None:
+        stats.update(size=key[2] if key else None, cached=False)
+        start = time.perf_counter()
+    if key is not None:
+        with _parsed_cache_lock:
+            blob = _parsed_cache.get(key)
+            if blob is not None:
+                _parsed_cache.move_to_end(key)
+        if blob is not None:
+            if stats is not None:
+                stats["cached"] = True
+            return pickle.loads(blob)
+    with open(path, "r", encoding=ENCODING) as fd:
+        buffer = cast(io.BufferedReader, fd.buffer)  # files opened buffered
+        if is_stream_encrypted(buffer):
+            if not passkey:
+                raise RuntimeError("Couldn't decrypt payload: no passkey")
+            config = backend[0](open_decrypted(buffer, passkey))
+            if stats is not None:  # all three happen chunk by chunk
+                stats["parse"] = time.perf_counter() - start
+        else:
+            payload = fd.read().strip()
+            if stats is not None:
+                now = time.perf_counter()
+                stats["read"], start = now - start, now
+            if passkey:
+                try:
+                    payload = decrypt(payload, passkey)
+                except RuntimeError:
+                    pass
+                if stats is not None:
+                    now = time.perf_counter()
+                    stats["decrypt"], start = now - start, now
+            config = backend[0](payload)
+            if stats is not None:
+                stats["parse"] = time.perf_counter() - start
+    if key is not None:
+        try:
+            blob = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return config  # not worth failing the read over
+        with _parsed_cache_lock:
+            _parsed_cache[key] = blob
+            while len(_parsed_cache) > PARSED_CACHE_SIZE:
+                _parsed_cache.popitem(last=False)
+    return config
+
+
+_read_executor: Optional[Executor] = None
+_read_executor_lock = threading.Lock()
+
+
+def _get_read_executor() -> Executor:
+    global _read_executor
+    with _read_executor_lock:
+        if _read_executor is None:
+            _read_executor = ThreadPoolExecutor(
+                READ_WORKERS, thread_name_prefix="the_conf-read"
+            )
+    return _read_executor
+
+
+def expand_paths(paths) -> List[str]:
+    """Return the absolute paths of the files paths point to. Directories
+    are replaced by the files of known type they hold and glob patterns by
+    the files they match, both sorted by name. Hidden files are ignored.
+    """
+    expanded, seen = [], set()
     for path in paths:
         path = abspath(expanduser(path.strip()))
-        ext = splitext(path)[1][1:]
-        try:
-            with open(path, "r", encoding=ENCODING) as fd:
-                payload = fd.read().strip()
-                if passkey:
-                    try:
-                        payload = decrypt(payload, passkey)
-                    except RuntimeError:
-                        pass
-                if ext in {"yml", "yaml"}:
-                    yield path, yaml.load(payload, Loader=yaml.FullLoader)
-                elif ext == "json":
-                    yield path, json.loads(payload)
-                else:
-                    logger.error(
-                        "File %r ignored: unknown type (%s)", path, ext
-                    )
-                    continue
-            any_found = True
-        except FileNotFoundError:
-            logger.debug("%r not found", path)
-        except PermissionError:
-            logger.warning("%r: no right to read", path)
+        if isdir(path):
+            matches = sorted(
+                entry.path
+                for entry in os.scandir(path)
+                if not entry.name.startswith(".")
+                and splitext(entry.name)[1][1:] in EXTENSIONS
+                and entry.is_file()
+            )
+        elif glob.has_magic(path):
+            matches = sorted(
+                match
+                for match in glob.glob(path, recursive=True)
+                if isfile(match)
+            )
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                expanded.append(match)
+    return expanded
+
+
+def _read_one(path, passkey, backends, with_stats=False):
+    """Return the parsed content of path, with the dict describing its
+    reading if with_stats is set, None if it couldn't be read."""
+    backend = get_backend(path, backends)
+    if backend is None:
+        logger.error(
+            "File %r ignored: unknown type (%s)",
+            path,
+            splitext(path)[1][1:],
+        )
+        return None
+    file_stats = {"path": path} if with_stats else None
+    try:
+        config = _parse(path, passkey, backend, file_stats)
+    except FileNotFoundError:
+        logger.debug("%r not found", path)
+    except PermissionError:
+        logger.warning("%r: no right to read", path)
+    except RuntimeError:
+        logger.error("%r: couldn't decrypt", path)
+    else:
+        return config, file_stats
+    return None
+
+
+def read(
+    paths,
+    passkey: Optional[str] = None,
+    backends: Optional[Dict[str, str]] = None,
+    stats: Optional[list] = None,
+    executor: Optional[Executor] = None,
+) -> Generator[Tuple[str, object], None, None]:
+    """Yield the path and parsed content of each file paths point to (see
+    expand_paths), in order.
+
+    Several files are read, decrypted and parsed in parallel, in executor or
+    in a thread pool of READ_WORKERS threads if None.
+    stats: if provided, a dict describing the reading of each file found is
+    appended to it before the file is yielded."""
+    paths = expand_paths(paths)
+    args = repeat(passkey), repeat(backends), repeat(stats is not None)
+    if len(paths) > 1:
+        results = (executor or _get_read_executor()).map(
+            _read_one, paths, *args
+        )
+    else:
+        results = map(_read_one, paths, *args)
+    any_found = False
+    for path, result in zip(paths, results):
+        if result is None:
+            continue
+        any_found = True
+        if stats is not None:
+            stats.append(result[1])
+        yield path, result[0]
     if not any_found:
         logger.warning("no file found among %r", paths)
 
 
+async def aread(
+    paths,
+    passkey: Optional[str] = None,
+    backends: Optional[Dict[str, str]] = None,
+    stats: Optional[list] = None,
+    executor: Optional[Executor] = None,
+) -> List[Tuple[str, object]]:
+    """Same as read, files being read, decrypted and parsed concurrently in
+    executor, the default one of the running loop if None."""
+    loop = asyncio.get_running_loop()
+    paths = expand_paths(paths)
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor, _read_one, path, passkey, backends, stats is not None
+            )
+            for path in paths
+        )
+    )
+    found = []
+    for path, result in zip(paths, results):
+        if result is not None:
+            if stats is not None:
+                stats.append(result[1])
+            found.append((path, result[0]))
+    if not found:
+        logger.warning("no file found among %r", paths)
+    return found
+
+
 def extract_value(config, path, full_path=None):
     full_path = full_path or []
     if len(path) == 1 and path[0] in config:
@@ -130,17 +554,111 @@ def extract_values(paths, config, config_file):
             logger.debug("%r not found in %r", path, config_file)
 
 
-def write(config, path):
+def _is_unchanged(
+    path: str, payload: str, passkey: Optional[Union[bytes, str]]
+) -> bool:
+    # nonces differ on each encryption, comparing plain texts
+    try:
+        with open(path, "r", encoding=ENCODING) as fd:
+            buffer = cast(io.BufferedReader, fd.buffer)
+            if is_stream_encrypted(buffer):
+                if not passkey:
+                    return False
+                return open_decrypted(buffer, passkey).read() == payload
+            current = fd.read()
+        if passkey:
+            current = decrypt(current.strip(), passkey)
+    except (OSError, UnicodeDecodeError, RuntimeError):
+        return False
+    return current == payload
+
+
+def _open_temporary(path: str, mode: int) -> Tuple[int, str]:
+    """Create a temporary file next to path, the kernel applying the umask
+    to mode as for any new file, and return its descriptor and path."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp_path = join(
+            dirname(path), f".{basename(path)}.{os.urandom(6).hex()}"
+        )
+        try:
+            return os.open(tmp_path, flags, mode), tmp_path
+        except FileExistsError:
+            continue
+
+
+def write_atomic(
+    path: str,
+    payload: Union[bytes, str],
+    passkey: Optional[Union[bytes, str]] = None,
+    mode: Optional[int] = None,
+) -> None:
+    """Write payload to a temporary file next to path, encrypted if a passkey
+    is provided, flush it to disk and move it in place, readers seeing either
+    the old or the new file. The file gets mode if provided, keeps the one of
+    the file it replaces otherwise. Symbolic links are written through, not
+    replaced."""
+    path = realpath(path)
+    directory = dirname(path)
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            pass
+    fd, tmp_path = _open_temporary(path, 0o666 if mode is None else mode)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            if passkey:
+                encrypt_stream(payload, passkey, fp)
+            else:
+                if isinstance(payload, str):
+                    payload = payload.encode(ENCODING)
+                fp.write(payload)
+            fp.flush()
+            os.fsync(fp.fileno())
+        if mode is not None:  # bypassing the umask
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    try:  # making the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def write(
+    config,
+    path,
+    backends: Optional[Dict[str, str]] = None,
+    passkey: Optional[Union[bytes, str]] = None,
+) -> bool:
+    """Serialize config to path, encrypted if a passkey is provided.
+
+    The file is replaced atomically and left untouched if its content
+    wouldn't change. Return whether the file was written.
+    """
     path = abspath(expanduser(path.strip()))
-    ext = splitext(path)[1][1:]
-    if ext in {"yml", "yaml"}:
-        with open(path, "w", encoding=ENCODING) as fp:
-            yaml.dump(config, fp)
-    elif ext == "json":
-        with open(path, "w", encoding=ENCODING) as fp:
-            json.dump(config, fp)
-    else:
+    backend = get_backend(path, backends)
+    if backend is None:
         raise ValueError(
             "couldn't make out file type, conf file path should "
             "end with either yml, yaml or json"
         )
+    payload = backend[1](config)
+    if _is_unchanged(path, payload, passkey):
+        logger.debug("%r unchanged, not rewriting it", path)
+        return False
+    write_atomic(path, payload, passkey)
+    invalidate_cache(path)
+    return True
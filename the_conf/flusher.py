@@ -0,0 +1,46 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Flusher(threading.Thread):
+    """Thread writing the values of a TheConf to its config file every
+    interval seconds, as long as some were changed since the last write.
+    """
+
+    def __init__(self, conf, interval=1.0, config_file=None, passkey=None):
+        super().__init__(name="the_conf-flusher", daemon=True)
+        self._conf = conf
+        self._interval = interval
+        self._config_file = config_file
+        self._passkey = passkey
+        self._stopped = threading.Event()
+        if conf._dirty is None:  # first write serializing the whole tree
+            conf._dirty = set()
+
+    @property
+    def pending(self):
+        return bool(self._conf._dirty) or self._conf._serialized is None
+
+    def flush(self, force=False):
+        """Write the config if it changed since last write, or anyway if
+        force is set. Return whether the file was written."""
+        if not force and not self.pending:
+            return False
+        return self._conf.write(self._config_file, self._passkey)
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("failed to write config file")
+
+    def stop(self):
+        """Stop the thread, writing the config a last time if it changed
+        since last write, whether pending changes were tracked or not."""
+        self._stopped.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        self.flush(force=True)  # files are left untouched if unchanged
@@ -1,29 +1,402 @@
 import logging
+import threading
+from array import array
+from collections.abc import MutableSequence
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from itertools import chain
+from operator import attrgetter, itemgetter
 
 from the_conf.utils import TYPE_MAPPING, Index, NoValue
-from the_conf.files import extract_value
+from the_conf.files import decrypt, encrypt, is_encrypted
+from the_conf.subscription import Subscription
 
 logger = logging.getLogger(__name__)
+_materialize_lock = threading.Lock()
+
+
+class FrozenNode:
+    """Read-only snapshot of a ConfNode.
+
+    Subclasses are generated with one slot per child, so that reading a value
+    costs as much as reading any plain attribute. Children which names aren't
+    identifiers, such as "log-level", are kept in a mapping instead.
+    """
+
+    __slots__ = ()
+    _fields: tuple = ()
+
+    def __init__(self, **values):
+        extra = {}
+        for key, value in values.items():
+            if key.isidentifier():
+                object.__setattr__(self, key, value)
+            else:
+                extra[key] = value
+        if extra:
+            object.__setattr__(self, "_extra", extra)
+
+    def __getattr__(self, key):
+        # only reached for unset slots and names which can't be slots
+        try:
+            return object.__getattribute__(self, "_extra")[key]
+        except (AttributeError, KeyError):
+            raise AttributeError(
+                f"{self.__class__.__name__!r} object has no attribute {key!r}"
+            ) from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.__class__.__name__} is read only")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} is read only")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, key, NoValue) == getattr(other, key, NoValue)
+            for key in self._fields
+        )
+
+    def __repr__(self):
+        values = ", ".join(
+            f"{key}={getattr(self, key)!r}"
+            for key in self._fields
+            if hasattr(self, key)
+        )
+        return f"<{self.__class__.__name__}({values})>"
+
+
+ACCESSORS_CACHE_SIZE = 256
+
+
+def split_path(path) -> tuple:
+    """Return path, a dotted string or a sequence, as a tuple, list indexes
+    being turned into int."""
+    if isinstance(path, str):
+        path = path.split(".") if path else ()
+    return tuple(
+        int(part) if isinstance(part, str) and part.isdigit() else part
+        for part in path
+    )
+
+
+def _chain(getters):
+    def getter(obj):
+        for step in getters:
+            obj = step(obj)
+        return obj
+
+    return getter
+
+
+@lru_cache(maxsize=ACCESSORS_CACHE_SIZE)
+def compile_getter(path):
+    """Return a callable fetching the value at path, a dotted string or a
+    tuple, from a node: names are looked up in one dotted attrgetter, list
+    indexes through itemgetter."""
+    if not path:
+        raise KeyError(path)
+    getters, names = [], []
+    for part in split_path(path):
+        if isinstance(part, int):
+            if names:
+                getters.append(attrgetter(".".join(names)))
+                names = []
+            getters.append(itemgetter(part))
+        else:
+            names.append(part)
+    if names:
+        getters.append(attrgetter(".".join(names)))
+    return getters[0] if len(getters) == 1 else _chain(tuple(getters))
+
+
+@lru_cache(maxsize=None)
+def _frozen_class(fields):
+    slots = tuple(field for field in fields if field.isidentifier())
+    if len(slots) != len(fields):
+        slots += ("_extra",)
+    return type(
+        FrozenNode.__name__,
+        (FrozenNode,),
+        {"__slots__": slots, "_fields": fields},
+    )
+
+
+def check_name(node_class, path, name):
+    """Raise ValueError if name, the name of a parameter to be held by an
+    instance of node_class, would be shadowed by one of its attributes."""
+    if hasattr(node_class, name):
+        raise ValueError(
+            f"parameter {'.'.join(map(str, path + [name]))!r} can't be "
+            f"named after {node_class.__name__}.{name}"
+        )
+
+
+def notifies(method):
+    """Wrap a method mutating a list so that it's marked dirty and that
+    subscribers are notified of the list as a whole, with its frozen values
+    before and after."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._root._subscriptions:
+            result = method(self, *args, **kwargs)
+            AbstractNode._mark_dirty(self._parent, self._name)
+            return result
+        before = self._freeze()
+        result = method(self, *args, **kwargs)
+        AbstractNode._mark_dirty(self._parent, self._name)
+        self._notify(tuple(self._path), before, self._freeze())
+        return result
+
+    return wrapper
+
+
+def parse_parameter(parameter):
+    """Return the type, the name of a parameter from the metaconf and
+    whether it describes a node (its settings being a list of parameters).
+    """
+    node_type = parameter.get("type", "dict")
+    node_type = TYPE_MAPPING.get(node_type) or node_type
+    name = next(key for key in parameter if key != "type")
+    return node_type, name, isinstance(parameter[name], list)
+
+
+def compile_parameter(node_path, name, settings):
+    """Check and normalize the settings of the parameter name, living at
+    node_path."""
+    has_default = bool("default" in settings)
+    has_type = bool(settings.get("type"))
+    # something smarter that'd allow custom type
+    if has_default and not has_type:
+        settings["type"] = type(settings["default"])
+    else:
+        if settings.get("type") in TYPE_MAPPING:
+            settings["type"] = TYPE_MAPPING[settings["type"]]
+        elif isinstance(settings.get("type"), type):
+            pass
+        elif has_type:
+            logger.warning("unknown type %r", settings["type"])
+            settings["type"] = str
+        else:
+            settings["type"] = str
+    has_among = bool(settings.get("among"))
+    settings["required"] = bool(settings.get("required"))
+    settings["read_only"] = bool(settings.get("read_only"))
+    settings["secret"] = bool(settings.get("secret"))
+
+    path = ".".join(map(str, chain(node_path, [name])))
+    if has_among:
+        assert isinstance(settings["among"], list), (
+            f"parameters {path!r} configuration has wrong value for "
+            "'among', should be a list, ignoring it"
+        )
+    if has_default and has_among:
+        assert settings.get("default") in settings.get("among"), (
+            f"default value for {path!r} is not among the "
+            f"selectable values ({settings.get('among')!r}"
+        )
+    if has_default and settings["required"]:
+        raise ValueError(
+            f"{path!r} required parameter can't have default value"
+        )
+
+    if "type" in settings and "default" in settings:
+        settings["default"] = settings["type"](settings["default"])
+    return settings
+
+
+def cast_value(node_path, settings, value):
+    """Check value against the settings of its parameter and cast it.
+    Values of secret parameters are wrapped into a Secret."""
+    if settings.get("secret") and not isinstance(value, Secret):
+        return Secret(node_path, settings, value)
+    return _check_and_cast(node_path, settings, value)
+
+
+def _check_and_cast(node_path, settings, value):
+    if "among" in settings:
+        if value not in settings["among"]:
+            raise ValueError(
+                f"{node_path!r}: value {value!r} isn't "
+                f"in {settings['among']!r}"
+            )
+    if "type" in settings:
+        value = settings["type"](value)
+    return value
+
+
+class Secret:
+    """Value of a secret parameter, kept encrypted until first read.
+
+    The value is decrypted with the passkey of the configuration on first
+    access and kept in memory afterward. Values set in clear are encrypted
+    once, when first written.
+    """
+
+    __slots__ = ("_node_path", "_settings", "_payload", "_value")
+
+    def __init__(self, node_path, settings, value):
+        self._node_path = node_path
+        self._settings = settings
+        if is_encrypted(value):
+            self._payload, self._value = value, NoValue
+        else:
+            self._payload = None
+            self._value = _check_and_cast(node_path, settings, value)
+
+    def reveal(self, passkey):
+        if self._value is NoValue:
+            value = self._payload
+            try:
+                if not passkey:
+                    raise RuntimeError("no passkey")
+                value = decrypt(self._payload, passkey)
+            except RuntimeError:
+                logger.warning(
+                    "couldn't decrypt %r, reading it in clear",
+                    ".".join(map(str, self._node_path)),
+                )
+            self._value = _check_and_cast(
+                self._node_path, self._settings, value
+            )
+        return self._value
+
+    def dump(self, passkey):
+        """Return the value as it should be written, encrypted if possible."""
+        if self._payload is None:
+            if not passkey:
+                return self._value
+            self._payload = encrypt(str(self._value), passkey)
+        return self._payload
+
+    def __eq__(self, other):
+        if not isinstance(other, Secret):
+            return NotImplemented
+        if self._payload is not None and self._payload == other._payload:
+            return True
+        return (
+            self._value is not NoValue
+            and other._value is not NoValue
+            and self._value == other._value
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
 
 
 class AbstractNode:
     def __init__(self, parameters=None, parent=None, name=""):
         self._name = name
         self._parent = parent
+        # nodes never move once built, the path is computed only once
+        self._path = [] if parent is None else parent._path + [name]
+        self._root = self if parent is None else parent._root
+        if parent is None:
+            self._subscriptions = []
+            self._dirty = None  # top level keys changed since last write
+            self._changes = None  # changes of the running transaction
+            self._provenance = None  # origins of values, if tracked
         self._parameters = {}
         self._children = []
         self._load_parameters(parameters if parameters is not None else [])
 
-    @property
-    def _path(self):
-        if self._parent is None:
-            return []
-        return self._parent._path + [self._name]
-
     def _get_path_val_param(self, absolute=True):
         raise NotImplementedError()
 
+    def _freeze(self, reveal=True):
+        """Return the values as FrozenNode and tuples, secrets being left
+        encrypted unless reveal."""
+        raise NotImplementedError()
+
+    def _mark_dirty(self, key):
+        root = self._root
+        if root._dirty is not None:
+            root._dirty.add(self._path[0] if self._path else key)
+        if root._provenance is not None:
+            root._provenance.assign(self._path + [key])
+
+    def _notify(self, path, old, new):
+        """Record a change, to be dispatched to subscribers right away or at
+        the end of the running transaction."""
+        root = self._root
+        if root._changes is None:
+            return root._dispatch({path: (old, new)})
+        if path in root._changes:
+            old = root._changes[path][0]
+        root._changes[path] = old, new
+
+    def _dispatch(self, changes):
+        changes = {
+            path: (old, new)
+            for path, (old, new) in changes.items()
+            if old != new
+        }
+        if not changes:
+            return
+        for subscription in list(self._root._subscriptions):
+            subscription.deliver(changes)
+
+    @contextmanager
+    def transaction(self):
+        """Batch changes made within the block, subscribers getting them
+        all at once when it exits."""
+        root = self._root
+        if root._changes is not None:  # nested, outer transaction dispatches
+            yield
+            return
+        root._changes = {}
+        try:
+            yield
+        finally:
+            changes, root._changes = root._changes, None
+            root._dispatch(changes)
+
+    def subscribe(self, path, callback, debounce=0, executor=None):
+        """Call callback with the changes made to path and below, path being
+        relative to this node and either a dotted string or a sequence.
+
+        Return the Subscription, which cancel() method unsubscribes.
+        """
+        path = tuple(self._path) + split_path(path)
+        subscription = Subscription(
+            self._root, path, callback, debounce, executor
+        )
+        self._root._subscriptions.append(subscription)
+        return subscription
+
+    def get(self, path, default=None):
+        """Return the value at path, relative to this node and either a
+        dotted string or a sequence, list indexes included. Return default
+        if there is no value there.
+        """
+        if not isinstance(path, str):
+            path = tuple(path)
+        try:
+            return compile_getter(path)(self)
+        except (AttributeError, IndexError):
+            return default
+
+    def set(self, path, value):
+        """Set value at path, relative to this node and either a dotted
+        string or a sequence, list indexes included."""
+        *parent, name = split_path(path)
+        owner = compile_getter(tuple(parent))(self) if parent else self
+        if isinstance(name, int):
+            owner[name] = value
+        else:
+            setattr(owner, name, value)
+
+    def _iter_schema(self):
+        """Yield every leaf of the schema as a (path, settings, node) tuple,
+        node being the closest object holding the value: the ConfNode for
+        plain values and the ListNode for anything living inside a list
+        (the path then containing `Index`).
+        """
+        raise NotImplementedError()
+
     def _set_to_path(self, path, value, overwrite=False):
         """Will set the value to the provided path. Local node if path length
         is one, a child node if path length is more that one.
@@ -33,13 +406,22 @@ class AbstractNode:
         """
 
     def _load_parameters(self, parameters):
+        lazy = getattr(self._root, "_lazy_nodes", False)
+        # items of lists are ConfNode
+        node_class = (
+            ConfNode if isinstance(self, LIST_NODE_TYPES) else type(self)
+        )
         for parameter in parameters:
-            node_type = parameter.get("type", "dict")
-            node_type = TYPE_MAPPING.get(node_type) or node_type
-            name = next(key for key in parameter if key != "type")
-            is_node = isinstance(parameter[name], list)
+            node_type, name, is_node = parse_parameter(parameter)
+            check_name(node_class, self._path, name)
             if node_type is dict:
-                if is_node and not self._has_attr(name):
+                if is_node and name in self.__dict__.get("_lazy", {}):
+                    self._lazy[name]._load_parameters(parameter[name])
+                elif is_node and not self._has_attr(name) and lazy:
+                    self.__dict__.setdefault("_lazy", {})[name] = LazyNode(
+                        parameters=parameter[name], name=name, parent=self
+                    )
+                elif is_node and not self._has_attr(name):
                     node = ConfNode(
                         parameters=parameter[name], name=name, parent=self
                     )
@@ -50,13 +432,7 @@ class AbstractNode:
                     self._load_parameter(name, parameter[name])
             elif node_type is list:
                 if not self._has_attr(name):
-                    node = ListNode(
-                        parameters=parameter[name] if is_node else None,
-                        node_type=None if is_node else parameter[name],
-                        name=name,
-                        parent=self,
-                    )
-                    setattr(self, name, node)
+                    setattr(self, name, make_list_node(parameter, self))
                 else:
                     raise Exception("_load_parameters")
             if name not in self._children:
@@ -66,51 +442,11 @@ class AbstractNode:
         if name in self._parameters:
             logger.debug("ignoring")
             return
-        has_default = bool("default" in settings)
-        has_type = bool(settings.get("type"))
-        # something smarter that'd allow custom type
-        if has_default and not has_type:
-            settings["type"] = type(settings["default"])
-        else:
-            if settings.get("type") in TYPE_MAPPING:
-                settings["type"] = TYPE_MAPPING[settings["type"]]
-            elif isinstance(settings.get("type"), type):
-                pass
-            elif has_type:
-                logger.warning("unknown type %r", settings["type"])
-                settings["type"] = str
-            else:
-                settings["type"] = str
-        has_among = bool(settings.get("among"))
-        settings["required"] = bool(settings.get("required"))
-        settings["read_only"] = bool(settings.get("read_only"))
-
-        path = ".".join(map(str, chain(self._path, [name])))
-        if has_among:
-            assert isinstance(settings["among"], list), (
-                f"parameters {path!r} configuration has wrong value for "
-                "'among', should be a list, ignoring it"
-            )
-        if has_default and has_among:
-            assert settings.get("default") in settings.get("among"), (
-                f"default value for {path!r} is not among the "
-                f"selectable values ({settings.get('among')!r}"
-            )
-        if has_default and settings["required"]:
-            raise ValueError(
-                f"{path!r} required parameter can't have default value"
-            )
-
-        if "type" in settings and "default" in settings:
-            settings["default"] = settings["type"](settings["default"])
-        self._parameters[name] = settings
+        self._parameters[name] = compile_parameter(self._path, name, settings)
 
     def _has_attr(self, attr):
-        try:
-            super().__getattribute__(attr)
-            return True
-        except AttributeError:
-            return False
+        """Tell if attr has been set, methods of the node left aside."""
+        return attr in self.__dict__
 
 
 class ConfNode(AbstractNode):
@@ -129,22 +465,52 @@ class ConfNode(AbstractNode):
             if read_only is not None:
                 self._parameters[attr]["read_only"] = read_only
             return res
-        return getattr(self, attr)._set_to_path(
+        return self._get_child(attr)._set_to_path(
             path[1:], value, overwrite=overwrite
         )
 
+    def _get_child(self, name):
+        """Return the child node name, without materializing it if lazy."""
+        lazy = self.__dict__.get("_lazy")
+        if lazy and name in lazy:
+            return lazy[name]
+        return getattr(self, name, None)
+
+    def __getattr__(self, name):
+        """Only called on missing attributes, materializes lazy nodes."""
+        lazy = self.__dict__.get("_lazy")
+        if name.startswith("_") or not lazy or name not in lazy:
+            raise AttributeError(
+                f"{self.__class__.__name__!r} object has no attribute {name!r}"
+            )
+        with _materialize_lock:
+            if name in lazy:
+                super().__setattr__(name, lazy[name]._materialize(self))
+                del lazy[name]
+        return super().__getattribute__(name)
+
     def __getattribute__(self, name):
         """Return a parameter of the node if this one is defined.
         Its default value if it has one.
         """
         if name.startswith("_"):
             return super().__getattribute__(name)
-        if "default" in self._parameters.get(name, {}):
-            try:  # Trying to get attr, if AttributeError => is absent
-                return super().__getattribute__(name)
-            except AttributeError:
+        try:  # Trying to get attr, if AttributeError => is absent
+            value = super().__getattribute__(name)
+        except AttributeError:
+            if "default" in self._parameters.get(name, {}):
                 return self._parameters[name]["default"]
-        return super().__getattribute__(name)
+            raise
+        if type(value) is Secret:
+            return value.reveal(getattr(self._root, "_passkey", None))
+        return value
+
+    def _get_value(self, name):
+        """Return the value of name or its default, secrets left as is."""
+        value = self.__dict__.get(name, NoValue)
+        if value is NoValue:
+            return self._parameters[name].get("default", NoValue)
+        return value
 
     def __setattr__(self, key, value):
         if key.startswith("_") or isinstance(value, AbstractNode):
@@ -153,28 +519,80 @@ class ConfNode(AbstractNode):
             raise ValueError(f"{self._path} is not a registered conf option")
         if self._parameters[key].get("read_only"):
             raise AttributeError("attribute is in read only mode")
-        if "among" in self._parameters[key]:
-            if value not in self._parameters[key]["among"]:
-                raise ValueError(
-                    f"{self._path!r}: value {value!r} isn't "
-                    f"in {self._parameters[key]['among']!r}"
-                )
-        if "type" in self._parameters[key]:
-            value = self._parameters[key]["type"](value)
-        return super().__setattr__(key, value)
+        value = cast_value(self._path, self._parameters[key], value)
+        # keys are marked dirty once changed, for concurrent flushes to
+        # write the new value
+        if not self._root._subscriptions:
+            super().__setattr__(key, value)
+            return self._mark_dirty(key)
+        if Index in self._path:  # items are notified through their list
+            return self._item_change(super().__setattr__, key, value)
+        old = self._get_value(key)
+        super().__setattr__(key, value)
+        self._mark_dirty(key)
+        self._notify(tuple(self._path) + (key,), old, value)
+
+    def __delattr__(self, key):
+        if key.startswith("_"):
+            return super().__delattr__(key)
+        if not self._root._subscriptions:
+            super().__delattr__(key)
+            return self._mark_dirty(key)
+        if Index in self._path:
+            return self._item_change(super().__delattr__, key)
+        old = self._get_value(key)
+        super().__delattr__(key)
+        self._mark_dirty(key)
+        self._notify(tuple(self._path) + (key,), old, self._get_value(key))
+
+    def _item_change(self, mutate, key, *args):
+        """Apply the change to key of this list item, its list being
+        notified if the item belongs to it already."""
+        owner = self._parent
+        if not any(item is self for item in owner):
+            mutate(key, *args)
+            return self._mark_dirty(key)
+        before = owner._freeze()
+        mutate(key, *args)
+        self._mark_dirty(key)
+        self._notify(tuple(owner._path), before, owner._freeze())
 
     def _get_path_val_param(self, absolute=True):
         for child in self._children:
-            if isinstance(getattr(self, child, None), AbstractNode):
-                yield from getattr(self, child)._get_path_val_param()
+            node = self._get_child(child)
+            if isinstance(node, (AbstractNode, LazyNode)):
+                yield from node._get_path_val_param()
             else:
                 if absolute:
                     path = self._path + [child]
                 else:
                     path = [child]
-                yield path, getattr(self, child, NoValue), self._parameters[
+                yield path, self._get_value(child), self._parameters[child]
+
+    def _freeze(self, reveal=True):
+        values = {}
+        for child in self._children:
+            value = self._get_child(child)
+            if not isinstance(value, (AbstractNode, LazyNode)):
+                if reveal:
+                    value = getattr(self, child, NoValue)
+                else:
+                    value = self._get_value(child)
+            if isinstance(value, (AbstractNode, LazyNode)):
+                values[child] = value._freeze(reveal)
+            elif value is not NoValue:
+                values[child] = value
+        return _frozen_class(tuple(self._children))(**values)
+
+    def _iter_schema(self):
+        for child in self._children:
+            node = self._get_child(child)
+            if isinstance(node, (AbstractNode, LazyNode)):
+                yield from node._iter_schema()
+            else:
+                yield tuple(self._path + [child]), self._parameters[
                     child
-                ]
+                ], self
 
     def __repr__(self):
         result = {"string": f"<{self.__class__.__name__}({{"}
@@ -221,6 +639,167 @@ class ConfNode(AbstractNode):
         return result["string"] + ")>"
 
 
+class LazyNode:
+    """Compact stand-in for a ConfNode which hasn't been accessed yet.
+
+    It holds the compiled settings of its parameters and the values loaded
+    for them, the ConfNode itself being built out of those on first access.
+    Once built, everything is forwarded to it.
+    """
+
+    __slots__ = (
+        "_name",
+        "_parent",
+        "_root",
+        "_path",
+        "_parameters",
+        "_children",
+        "_nodes",
+        "_values",
+        "_node",
+    )
+
+    def __init__(self, parameters, parent, name):
+        self._name = name
+        self._parent = parent
+        self._root = parent._root
+        self._path = parent._path + [name]
+        self._parameters = {}
+        self._children = []
+        self._nodes = {}
+        self._values = {}
+        self._node = None
+        self._load_parameters(parameters)
+
+    def _load_parameters(self, parameters):
+        if self._node is not None:
+            return self._node._load_parameters(parameters)
+        for parameter in parameters:
+            node_type, name, is_node = parse_parameter(parameter)
+            check_name(ConfNode, self._path, name)
+            if node_type is dict:
+                if is_node and name in self._nodes:
+                    self._nodes[name]._load_parameters(parameter[name])
+                elif is_node:
+                    self._nodes[name] = LazyNode(parameter[name], self, name)
+                elif name not in self._parameters:
+                    self._parameters[name] = compile_parameter(
+                        self._path, name, parameter[name]
+                    )
+            elif node_type is list:
+                if name in self._nodes:
+                    raise Exception("_load_parameters")
+                self._nodes[name] = make_list_node(parameter, self)
+            if name not in self._children:
+                self._children.append(name)
+
+    def _materialize(self, parent):
+        node = ConfNode(parent=parent, name=self._name)
+        node._parameters, node._children = self._parameters, self._children
+        for name, child in self._nodes.items():
+            if isinstance(child, LazyNode):
+                child._parent = node
+                node.__dict__.setdefault("_lazy", {})[name] = child
+            else:
+                setattr(node, name, child)
+        node.__dict__.update(self._values)
+        self._node = node
+        return node
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._node is not None:
+            return getattr(self._node, name)
+        if name in self._values:
+            value = self._values[name]
+            if type(value) is Secret:
+                return value.reveal(getattr(self._root, "_passkey", None))
+            return value
+        if "default" in self._parameters.get(name, {}):
+            return self._parameters[name]["default"]
+        raise AttributeError(name)
+
+    def _get_value(self, name):
+        if self._node is not None:
+            return self._node._get_value(name)
+        if name in self._values:
+            return self._values[name]
+        return self._parameters[name].get("default", NoValue)
+
+    def __delattr__(self, name):
+        if name.startswith("_"):
+            return super().__delattr__(name)
+        if self._node is not None:
+            return delattr(self._node, name)
+        old = self._get_value(name)
+        del self._values[name]
+        AbstractNode._mark_dirty(self, name)
+        if self._root._subscriptions:
+            self._root._notify(
+                tuple(self._path) + (name,), old, self._get_value(name)
+            )
+
+    def _has_attr(self, name):
+        if self._node is not None:
+            return self._node._has_attr(name)
+        return name in self._values or name in self._nodes
+
+    def _set_to_path(self, path, value, overwrite=False):
+        if self._node is not None:
+            return self._node._set_to_path(path, value, overwrite=overwrite)
+        name = path[0]
+        if len(path) > 1:
+            return self._nodes[name]._set_to_path(
+                path[1:], value, overwrite=overwrite
+            )
+        if not overwrite and name in self._values:
+            return
+        old = self._get_value(name)
+        value = cast_value(self._path, self._parameters[name], value)
+        self._values[name] = value
+        AbstractNode._mark_dirty(self, name)
+        if self._root._subscriptions:
+            self._root._notify(tuple(self._path) + (name,), old, value)
+
+    def _get_path_val_param(self, absolute=True):
+        if self._node is not None:
+            yield from self._node._get_path_val_param(absolute)
+            return
+        for child in self._children:
+            if child in self._nodes:
+                yield from self._nodes[child]._get_path_val_param()
+            else:
+                yield self._path + [child], self._get_value(
+                    child
+                ), self._parameters[child]
+
+    def _iter_schema(self):
+        if self._node is not None:
+            yield from self._node._iter_schema()
+            return
+        for child in self._children:
+            if child in self._nodes:
+                yield from self._nodes[child]._iter_schema()
+            else:
+                yield tuple(self._path + [child]), self._parameters[
+                    child
+                ], self
+
+    def _freeze(self, reveal=True):
+        if self._node is not None:
+            return self._node._freeze(reveal)
+        values = {}
+        for child in self._children:
+            if child in self._nodes:
+                values[child] = self._nodes[child]._freeze(reveal)
+            elif not reveal and self._get_value(child) is not NoValue:
+                values[child] = self._get_value(child)
+            elif reveal and getattr(self, child, NoValue) is not NoValue:
+                values[child] = getattr(self, child)
+        return _frozen_class(tuple(self._children))(**values)
+
+
 class ListNode(list, AbstractNode):
     def __init__(
         self,
@@ -237,10 +816,25 @@ class ListNode(list, AbstractNode):
 
     @property
     def _template_node(self):
-        parameters = [
-            {child: self._parameters[child]} for child in self._children
-        ]
-        return ConfNode(parameters, parent=self, name=Index)
+        """Return a new item for a list of nodes.
+
+        Settings of the item parameters were compiled along with the list,
+        so new items are cloned out of a prototype sharing them instead of
+        being built out of the metaconf all over again.
+        """
+        prototype = self.__dict__.get("_prototype")
+        if prototype is None:
+            prototype = self._prototype = {
+                "_name": Index,
+                "_parent": self,
+                "_path": self._path + [Index],
+                "_root": self._root,
+                "_parameters": self._parameters,
+                "_children": self._children,
+            }
+        node = ConfNode.__new__(ConfNode)
+        node.__dict__.update(prototype)
+        return node
 
     def _get_path_val_param(self, absolute=True):
         path = self._path
@@ -264,16 +858,54 @@ class ListNode(list, AbstractNode):
             else:
                 yield path + [Index], self, self._parameters
 
-    def __setitem__(self, index, value):
+    def _freeze(self, reveal=True):
+        return tuple(
+            item._freeze(reveal) if isinstance(item, AbstractNode) else item
+            for item in self
+        )
+
+    def _iter_schema(self):
+        path = tuple(self._path) + (Index,)
+        if not self._children:
+            yield path, self._parameters, self
+        for child in self._children:
+            yield path + (child,), self._parameters[child], self
+
+    def _cast(self, value):
         if self._node_type.get("type"):
             if not isinstance(value, self._node_type["type"]):
                 value = self._node_type["type"](value)
-            return super().__setitem__(index, value)
+            return value
+        if isinstance(value, ConfNode) and value._parent is self:
+            return value  # item already built for this list
+        # filling the new item directly, it isn't in the list yet
         node = self._template_node
-        for path, _, _ in node._get_path_val_param(absolute=False):
-            for _, sub_value in extract_value(value, path):
-                node._set_to_path(path, sub_value)
-        return super().__setitem__(index, node)
+        for child in self._children:
+            if child in value:
+                node.__dict__[child] = cast_value(
+                    node._path, self._parameters[child], value[child]
+                )
+        return node
+
+    @notifies
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [self._cast(item) for item in value]
+        else:
+            value = self._cast(value)
+        return super().__setitem__(index, value)
+
+    __delitem__ = notifies(list.__delitem__)
+    __iadd__ = notifies(list.__iadd__)
+    __imul__ = notifies(list.__imul__)
+    append = notifies(list.append)
+    extend = notifies(list.extend)
+    insert = notifies(list.insert)
+    pop = notifies(list.pop)
+    remove = notifies(list.remove)
+    clear = notifies(list.clear)
+    sort = notifies(list.sort)
+    reverse = notifies(list.reverse)
 
     def _set_to_path(self, path, value, overwrite=False):
         assert isinstance(path[0], int)
@@ -286,3 +918,153 @@ class ListNode(list, AbstractNode):
             while len(self) <= path[0]:
                 self.append(self._template_node)
             self[path[0]]._set_to_path(path[1:], value, overwrite)
+
+
+class ArrayListNode(MutableSequence, AbstractNode):
+    """List of int or float values stored in a compact array.
+
+    Selected with the 'storage: array' setting on simple lists. Items take
+    a few bytes each instead of a whole Python object and values loaded from
+    sources are converted in batch.
+    """
+
+    TYPECODES = {int: "q", float: "d"}
+
+    def __init__(self, parent=None, name="", node_type=None):
+        AbstractNode.__init__(self, None, parent, name)
+        self._node_type = compile_parameter(self._path[:-1], name, node_type)
+        if self._node_type["type"] not in self.TYPECODES:
+            raise ValueError(
+                f"{'.'.join(self._path)!r}: array storage is only available "
+                f"for {' and '.join(t.__name__ for t in self.TYPECODES)}"
+            )
+        self._array = array(self.TYPECODES[self._node_type["type"]])
+
+    def _cast(self, value):
+        return cast_value(self._path, self._node_type, value)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._array[index].tolist()
+        return self._array[index]
+
+    @notifies
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._array[index] = array(
+                self._array.typecode, map(self._cast, value)
+            )
+        else:
+            self._array[index] = self._cast(value)
+
+    @notifies
+    def __delitem__(self, index):
+        del self._array[index]
+
+    @notifies
+    def insert(self, index, value):
+        self._array.insert(index, self._cast(value))
+
+    # implemented on the array rather than through the methods above, so
+    # that subscribers are notified once
+    @notifies
+    def append(self, value):
+        self._array.append(self._cast(value))
+
+    @notifies
+    def extend(self, values):
+        self._array.extend(
+            array(self._array.typecode, map(self._cast, values))
+        )
+
+    @notifies
+    def pop(self, index=-1):
+        return self._array.pop(index)
+
+    @notifies
+    def remove(self, value):
+        self._array.remove(value)
+
+    @notifies
+    def reverse(self):
+        self._array.reverse()
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    @notifies
+    def clear(self):
+        del self._array[:]
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayListNode):
+            return self._array == other._array
+        if isinstance(other, (list, tuple)):
+            return self._array.tolist() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._array.tolist())
+
+    def as_numpy(self):
+        """Return a numpy array sharing its memory with this list, which is
+        not to be resized while the array is in use."""
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        return numpy.frombuffer(self._array, dtype=self._array.typecode)
+
+    def _set_items(self, items):
+        """Set (index, value) items in one go, with the semantics of
+        _set_to_path: indexes past the end are appended."""
+        if "among" in self._node_type:
+            values = [self._cast(value) for _, value in items]
+        else:
+            values = list(map(self._node_type["type"], (v for _, v in items)))
+        if not self._array and all(
+            index >= position for position, (index, _) in enumerate(items)
+        ):
+            self._array.extend(array(self._array.typecode, values))
+        else:
+            for (index, _), value in zip(items, values):
+                if len(self._array) <= index:
+                    self._array.append(value)
+                else:
+                    self._array[index] = value
+        AbstractNode._mark_dirty(self._parent, self._name)
+
+    def _set_to_path(self, path, value, overwrite=False):
+        assert isinstance(path[0], int) and len(path) == 1
+        self._set_items([(path[0], value)])
+
+    def _get_path_val_param(self, absolute=True):
+        if not self._array:
+            yield self._path + [Index], self, self._node_type
+        for index, value in enumerate(self._array):
+            yield self._path + [index], value, self._node_type
+
+    def _iter_schema(self):
+        yield tuple(self._path) + (Index,), self._node_type, self
+
+    def _freeze(self, reveal=True):
+        return tuple(self._array)
+
+
+LIST_NODE_TYPES = (ListNode, ArrayListNode)
+
+
+def make_list_node(parameter, parent):
+    _, name, is_node = parse_parameter(parameter)
+    if not is_node and parameter[name].get("storage") == "array":
+        return ArrayListNode(
+            parent=parent, name=name, node_type=parameter[name]
+        )
+    return ListNode(
+        parameters=parameter[name] if is_node else None,
+        node_type=None if is_node else parameter[name],
+        name=name,
+        parent=parent,
+    )
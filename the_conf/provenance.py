@@ -0,0 +1,113 @@
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from the_conf.environement import path_to_env_key
+from the_conf.utils import Index
+
+# codes stored in the table, 0 meaning no source provided the value
+KINDS = (None, "cmd", "env", "file", "set")
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+
+class Origin(NamedTuple):
+    """Where a value comes from: source is one of "cmd", "env", "file",
+    "set" (assigned once loaded) or "default". file is the config file and
+    env the environment variable it was read from, if so."""
+
+    source: str
+    file: Optional[str] = None
+    env: Optional[str] = None
+
+
+def _schema_path(path) -> tuple:
+    return tuple(Index if isinstance(part, int) else part for part in path)
+
+
+class Provenance:
+    """The source of every value of a schema, kept in flat arrays indexed
+    by the id of the schema path of the value: a one byte source kind and,
+    for config files, the id of the file in a list of paths.
+
+    Items of a list share the source of the list, which are set as a whole.
+    """
+
+    __slots__ = ("_path_ids", "_list_ids", "_kinds", "_file_ids", "_files")
+
+    def __init__(self, schema_paths: Iterable[tuple]):
+        self._path_ids: Dict[tuple, int] = {
+            path: path_id for path_id, path in enumerate(schema_paths)
+        }
+        # ids of the leaves of lists, which are recorded as a whole
+        self._list_ids: Dict[tuple, List[int]] = {}
+        for path, path_id in self._path_ids.items():
+            if Index in path:
+                list_path = path[: path.index(Index)]
+                self._list_ids.setdefault(list_path, []).append(path_id)
+        self._kinds = bytearray(len(self._path_ids))
+        self._file_ids = array("i", bytes(4 * len(self._path_ids)))
+        self._files: List[str] = []
+
+    def _get_file_id(self, conf_file: str) -> int:
+        try:
+            return self._files.index(conf_file)
+        except ValueError:
+            self._files.append(conf_file)
+            return len(self._files) - 1
+
+    def _get_path_id(self, path) -> Optional[int]:
+        path = _schema_path(path)
+        path_id = self._path_ids.get(path)
+        if path_id is None and path in self._list_ids:
+            path_id = self._list_ids[path][0]
+        return path_id
+
+    def _get_path_ids(self, path) -> List[int]:
+        path = _schema_path(path)
+        if path in self._path_ids:
+            return [self._path_ids[path]]
+        return self._list_ids.get(path, [])
+
+    def _record(self, path_id: int, source: str):
+        if source in _KIND_CODES:
+            self._kinds[path_id] = _KIND_CODES[source]
+        else:
+            self._kinds[path_id] = _KIND_CODES["file"]
+            self._file_ids[path_id] = self._get_file_id(source)
+
+    def build(self, records: List[Tuple[str, dict]], paths=None):
+        """Set the source of paths, all of them by default, from records of
+        the values of each source, ordered by precedence."""
+        if paths is None:
+            self._kinds[:] = bytes(len(self._kinds))
+            path_ids = None
+        else:
+            path_ids = set()
+            for path in paths:
+                for path_id in self._get_path_ids(path):
+                    self._kinds[path_id] = 0
+                    path_ids.add(path_id)
+        for source, record in reversed(records):
+            for path in record:
+                for path_id in self._get_path_ids(path):
+                    if path_ids is None or path_id in path_ids:
+                        self._record(path_id, source)
+
+    def assign(self, path):
+        """Record the value at path as assigned by hand."""
+        for path_id in self._get_path_ids(path):
+            self._kinds[path_id] = _KIND_CODES["set"]
+
+    def get(self, path) -> Optional[Origin]:
+        """Return the origin of the value set at path, None if no source
+        provided it."""
+        path_id = self._get_path_id(path)
+        if path_id is None:
+            return None
+        kind = KINDS[self._kinds[path_id]]
+        if kind is None:
+            return None
+        if kind == "file":
+            return Origin(kind, file=self._files[self._file_ids[path_id]])
+        if kind == "env" and _schema_path(path) in self._path_ids:
+            return Origin(kind, env=path_to_env_key(map(str, path)))
+        return Origin(kind)  # lists as a whole come from several variables
@@ -0,0 +1,203 @@
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from os.path import isdir
+from typing import Tuple
+
+from the_conf.files import decrypt, write_atomic
+from the_conf.node import FrozenNode, Secret
+
+# a snapshot is a header followed by encoded values, each starting with a one
+# byte tag; nodes and lists refer to their children by offset, so that any
+# value can be decoded without decoding the others
+MAGIC = b"TCSHM"
+VERSION = 1
+_HEADER = struct.Struct("<5sBI")  # magic, version, root offset
+_U16, _U32 = struct.Struct("<H"), struct.Struct("<I")
+_I64, _F64 = struct.Struct("<q"), struct.Struct("<d")
+SHARED_DIR = "/dev/shm"  # tmpfs, falling back on the temporary directory
+# secrets are kept encrypted, along with the type to cast them back to
+_SECRET_TYPES = {str: b"s", int: b"i", float: b"f", bool: b"b"}
+_SECRET_CASTS = {
+    b"s": str,
+    b"i": int,
+    b"f": float,
+    b"b": lambda value: value == "True",
+}
+
+
+def _encode(value, out: bytearray, passkey=None) -> int:
+    """Append value to out, return its offset."""
+    if isinstance(value, FrozenNode):
+        fields: Tuple[str, ...] = value._fields
+        entries = [
+            (key.encode(), _encode(getattr(value, key), out, passkey))
+            for key in fields
+            if hasattr(value, key)
+        ]
+        offset = len(out)
+        out += b"n" + _U32.pack(len(entries))
+        for key, child in entries:
+            out += _U16.pack(len(key)) + key + _U32.pack(child)
+        return offset
+    if isinstance(value, tuple):
+        children = [_encode(item, out, passkey) for item in value]
+        offset = len(out)
+        out += b"l" + _U32.pack(len(children))
+        out += b"".join(map(_U32.pack, children))
+        return offset
+    offset = len(out)
+    if isinstance(value, Secret):
+        if not passkey:
+            raise ValueError("secrets can't be shared without a passkey")
+        type_code = _SECRET_TYPES.get(type(value.reveal(passkey)))
+        if type_code is None:
+            raise ValueError(
+                "only str, int, float and bool secrets are shared"
+            )
+        data = value.dump(passkey).encode()
+        out += b"e" + type_code + _U32.pack(len(data)) + data
+    elif value is None:
+        out += b"z"
+    elif isinstance(value, bool):
+        out += b"b" + bytes([value])
+    elif isinstance(value, int) and -(2**63) <= value < 2**63:
+        out += b"i" + _I64.pack(value)
+    elif isinstance(value, float):
+        out += b"f" + _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out += b"s" + _U32.pack(len(data)) + data
+    else:
+        data = pickle.dumps(value)
+        out += b"p" + _U32.pack(len(data)) + data
+    return offset
+
+
+def dumps(frozen: FrozenNode, passkey=None) -> bytes:
+    """Encode frozen, which secrets are encrypted with passkey."""
+    out = bytearray(_HEADER.size)
+    root = _encode(frozen, out, passkey)
+    _HEADER.pack_into(out, 0, MAGIC, VERSION, root)
+    return bytes(out)
+
+
+def _decode(buffer, offset, passkey):
+    start = offset + 1
+    tag = buffer[offset:start]
+    if tag == b"n":
+        return SharedNode(buffer, offset, passkey)
+    if tag == b"s" or tag == b"p":
+        (size,) = _U32.unpack_from(buffer, start)
+        start += 4
+        end = start + size
+        data = buffer[start:end]
+        return data.decode() if tag == b"s" else pickle.loads(data)
+    if tag == b"i":
+        return _I64.unpack_from(buffer, offset + 1)[0]
+    if tag == b"f":
+        return _F64.unpack_from(buffer, offset + 1)[0]
+    if tag == b"b":
+        return buffer[offset + 1] == 1
+    if tag == b"z":
+        return None
+    if tag == b"l":
+        (count,) = _U32.unpack_from(buffer, offset + 1)
+        return tuple(
+            _decode(
+                buffer,
+                _U32.unpack_from(buffer, offset + 5 + 4 * i)[0],
+                passkey,
+            )
+            for i in range(count)
+        )
+    if tag == b"e":
+        if not passkey:
+            raise ValueError("a passkey is required to read shared secrets")
+        end = start + 1
+        type_code = buffer[start:end]
+        (size,) = _U32.unpack_from(buffer, end)
+        start = end + 4
+        end = start + size
+        data = buffer[start:end].decode()
+        return _SECRET_CASTS[type_code](decrypt(data, passkey))
+    raise ValueError(f"corrupted snapshot, unknown tag {tag!r} at {offset}")
+
+
+class SharedNode:
+    """Read-only node which values are decoded from a shared buffer on
+    first access. Only the values read are ever copied in the memory of the
+    process, the buffer itself staying shared. Secrets are decrypted with
+    passkey."""
+
+    __slots__ = ("_buffer", "_offsets", "_values", "_passkey")
+
+    def __init__(self, buffer, offset, passkey=None):
+        (count,) = _U32.unpack_from(buffer, offset + 1)
+        offsets, position = {}, offset + 5
+        for _ in range(count):
+            (size,) = _U16.unpack_from(buffer, position)
+            position += 2
+            end = position + size
+            key = buffer[position:end].decode()
+            position = end
+            (offsets[key],) = _U32.unpack_from(buffer, position)
+            position += 4
+        object.__setattr__(self, "_buffer", buffer)
+        object.__setattr__(self, "_offsets", offsets)
+        object.__setattr__(self, "_values", {})
+        object.__setattr__(self, "_passkey", passkey)
+
+    def __getattr__(self, name):
+        values = self._values
+        if name in values:
+            return values[name]
+        try:
+            offset = self._offsets[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self.__class__.__name__!r} object has no attribute {name!r}"
+            ) from None
+        value = values[name] = _decode(self._buffer, offset, self._passkey)
+        return value
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.__class__.__name__} is read only")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} is read only")
+
+    def __dir__(self):
+        return list(self._offsets)
+
+    def __repr__(self):
+        values = ", ".join(
+            f"{key}={getattr(self, key)!r}" for key in self._offsets
+        )
+        return f"<{self.__class__.__name__}({values})>"
+
+
+def dump(frozen: FrozenNode, path=None, passkey=None) -> str:
+    """Write the snapshot of frozen to path, a new file in SHARED_DIR if
+    None, and return the path. The file is only readable by its owner."""
+    if path is None:
+        directory = SHARED_DIR if isdir(SHARED_DIR) else None
+        fd, path = tempfile.mkstemp(
+            prefix="the_conf-", suffix=".snapshot", dir=directory
+        )
+        os.close(fd)
+    write_atomic(path, dumps(frozen, passkey), mode=0o600)
+    return path
+
+
+def attach(path, passkey=None) -> SharedNode:
+    """Map the snapshot at path in memory and return its root node, which
+    secrets are decrypted with passkey."""
+    with open(path, "rb") as fd:
+        buffer = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, root = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path!r} isn't a snapshot of a known version")
+    return SharedNode(buffer, root, passkey)
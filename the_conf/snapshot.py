@@ -0,0 +1,193 @@
+"""Snapshot of the values of a loaded configuration.
+
+Given the same schema, config files, environ and command line, loading
+always ends up with the same values. A snapshot stores those values along
+with stamps of everything they depend on, so that later starts can set them
+right away as long as the stamps still match.
+"""
+import hashlib
+import io
+import logging
+import os
+import pickle
+import struct
+import sys
+from typing import Any, Dict, List, Tuple
+
+from the_conf import command_line, environement, files, node
+from the_conf.cache import get_version
+from the_conf.utils import Index
+
+logger = logging.getLogger(__name__)
+MAGIC = b"TCSNP"
+SNAPSHOT_FORMAT = 2
+_HEADER = struct.Struct("<5sB")
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def get_stamps(conf, config_files) -> dict:
+    """Return what the values of conf depend on, config_files being the
+    config files it was loaded from."""
+    stamps: Dict[str, Any] = {
+        "schema": _digest(
+            (
+                SNAPSHOT_FORMAT,
+                get_version(),
+                conf._source_order,
+                conf._config_file_cmd_line,
+                conf._config_file_environ,
+                conf._passkey_cmd_line,
+                conf._passkey_environ,
+                conf._backends,
+                conf._reloadable,
+                [
+                    (path, settings)
+                    for path, (settings, _) in conf._schema.items()
+                ],
+            )
+        ),
+        "config_files": list(config_files),
+        "files": [],
+    }
+    for path in files.expand_paths(config_files):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamps["files"].append((path, None, None))
+        else:
+            stamps["files"].append((path, stat.st_mtime_ns, stat.st_size))
+    if "env" in conf._source_order:
+        environ = os.environ if conf._environ is None else conf._environ
+        if conf._environ_matcher is None:
+            conf._environ_matcher = environement.EnvironMatcher(conf._schema)
+        stamps["env"] = _digest(
+            (
+                [match[1:] for match in conf._environ_matcher.match(environ)],
+                [
+                    (key, environ.get(key))
+                    for key in conf._config_file_environ
+                    + conf._passkey_environ
+                ],
+            )
+        )
+    if "cmd" in conf._source_order:
+        opts = conf._cmd_line_opts
+        stamps["cmd"] = _digest(tuple(sys.argv[1:] if opts is None else opts))
+    return stamps
+
+
+def get_values(conf) -> List[Tuple[tuple, object]]:
+    """Return the path and value of every value set in conf, secrets being
+    kept encrypted."""
+    values: List[Tuple[tuple, object]] = []
+    lists = set()
+    for path, (_, owner) in conf._schema.items():
+        if isinstance(owner, node.LIST_NODE_TYPES):
+            if id(owner) not in lists:
+                lists.add(id(owner))
+                values.extend(
+                    (tuple(item_path), value)
+                    for item_path, value, _ in owner._get_path_val_param()
+                    if Index not in item_path
+                )
+        elif owner._has_attr(path[-1]):
+            values.append((path, owner._get_value(path[-1])))
+    return [
+        (
+            path,
+            value.dump(conf._passkey)
+            if isinstance(value, node.Secret)
+            else value,
+        )
+        for path, value in values
+    ]
+
+
+def dump(path: str, conf) -> None:
+    """Store the values of conf at path, with the stamps they're valid for."""
+    state = {
+        "stamps": get_stamps(conf, conf._config_files),
+        "sources": conf._sources,  # only kept if reloadable
+        "provenance": conf._provenance,
+        "values": get_values(conf),
+    }
+    try:
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        # values may come from encrypted files, so is the snapshot
+        files.write_atomic(
+            path,
+            _HEADER.pack(MAGIC, SNAPSHOT_FORMAT) + payload,
+            conf._passkey,
+            mode=0o600,
+        )
+    except (OSError, pickle.PicklingError):
+        logger.warning("couldn't write snapshot %r", path, exc_info=True)
+
+
+def _get_loaded_settings(conf):
+    """Return the config files and passkey loading conf would end up with,
+    the command line and environ adding to those of the metaconf."""
+    config_files, passkey = list(conf._config_files), conf._passkey
+    for order in conf._source_order:
+        if order == "cmd":
+            gen = command_line.yield_values_from_cmd(
+                [],
+                conf._cmd_line_opts,
+                conf._config_file_cmd_line,
+                conf._passkey_cmd_line,
+            )
+            config_file = next(gen)
+            if config_file:
+                config_files.insert(0, config_file)
+            passkey = next(gen) or passkey
+        elif order == "env":
+            environ = os.environ if conf._environ is None else conf._environ
+            for key in conf._config_file_environ:
+                if key in environ:
+                    config_files.insert(0, environ[key])
+            for key in conf._passkey_environ:
+                if key in environ:
+                    passkey = environ[key]
+    return config_files, passkey
+
+
+def load(path: str, conf) -> bool:
+    """Set the values stored at path into conf, which is to be freshly
+    built and not loaded. Return False if there was no snapshot or if it is
+    outdated, conf being left untouched."""
+    config_files, passkey = _get_loaded_settings(conf)
+    try:
+        with open(path, "rb") as fd:
+            stream = fd
+            if files.is_stream_encrypted(fd):
+                if not passkey:
+                    raise ValueError("no passkey to decrypt snapshot")
+                stream = io.BufferedReader(files.DecryptingReader(fd, passkey))
+            header = stream.read(_HEADER.size)
+            if header != _HEADER.pack(MAGIC, SNAPSHOT_FORMAT):
+                raise ValueError("unknown snapshot format")
+            state = pickle.load(stream)
+    except FileNotFoundError:
+        return False
+    except Exception:
+        logger.warning("ignoring unusable snapshot %r", path, exc_info=True)
+        return False
+    if state["stamps"] != get_stamps(conf, config_files):
+        logger.debug("snapshot %r is outdated", path)
+        return False
+    conf._config_files, conf._passkey = config_files, passkey
+    conf._sources = state["sources"]
+    values, batches = conf._split_compact(state["values"])
+    for value_path, value in values:
+        conf._set_to_path(list(value_path), value, overwrite=True)
+    for owner, items in batches:
+        owner._set_items(items)
+    if conf._provenance is not None:  # values being set marked them so
+        if state["provenance"] is not None:
+            conf._provenance = state["provenance"]
+        else:
+            conf._provenance.build(conf._get_records())
+    return True
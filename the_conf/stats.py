@@ -0,0 +1,67 @@
+import logging
+from typing import Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+Hook = Callable[[str, float, dict], None]
+
+
+class LoadStats:
+    """What loading a TheConf took: the duration of each phase (metaconf,
+    then one per source and check), a record per config file read (size,
+    time spent reading, decrypting, parsing and extracting it, number of
+    values read from it) and the number of values read from each source.
+
+    Hooks are called with the name of each phase or "file", its duration and
+    its details as they complete.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = ()):
+        self.hooks: List[Hook] = list(hooks)
+        self.phases: Dict[str, float] = {}
+        self.files: List[dict] = []
+        self.values: Dict[str, int] = {}
+
+    def reset(self):
+        """Forget about the previous load, metaconf compilation aside."""
+        self.phases = {
+            phase: duration
+            for phase, duration in self.phases.items()
+            if phase == "metaconf"
+        }
+        self.files, self.values = [], {}
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def add_phase(self, phase: str, duration: float, **details):
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+        if "values" in details:
+            self.values[phase] = self.values.get(phase, 0) + details["values"]
+        self._call_hooks(phase, duration, details)
+
+    def add_file(self, details: dict):
+        self.files.append(details)
+        self._call_hooks("file", details["duration"], details)
+
+    def _call_hooks(self, name, duration, details):
+        for hook in self.hooks:
+            try:
+                hook(name, duration, details)
+            except Exception:
+                logger.exception("load stats hook %r failed", hook)
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "phases": dict(self.phases),
+            "files": [dict(details) for details in self.files],
+            "values": dict(self.values),
+        }
+
+    def __repr__(self):
+        phases = ", ".join(
+            f"{phase}={duration:.6f}s"
+            for phase, duration in self.phases.items()
+        )
+        return f"<{self.__class__.__name__}({phases})>"
@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+Changes = Dict[tuple, Tuple[object, object]]
+
+
+class Subscription:
+    """Callback to be called with the changes made under a given path.
+
+    Changes are passed as a dict mapping the path of each modified value to
+    an (old value, new value) tuple. If debounce is set, changes happening
+    within that many seconds are merged and passed in a single call. If an
+    executor is provided, callbacks are submitted to it instead of being
+    called in the thread that made the changes.
+    """
+
+    def __init__(
+        self,
+        root,
+        path: tuple,
+        callback: Callable[[Changes], None],
+        debounce: float = 0,
+        executor=None,
+    ):
+        self._root = root
+        self.path = path
+        self.callback = callback
+        self.debounce = debounce
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._pending: Changes = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def matches(self, path: tuple) -> bool:
+        # changes on a whole list concern subscribers to its items as well
+        size = min(len(path), len(self.path))
+        return path[:size] == self.path[:size]
+
+    def deliver(self, changes: Changes) -> None:
+        changes = {
+            path: values
+            for path, values in changes.items()
+            if self.matches(path)
+        }
+        if not changes:
+            return
+        if not self.debounce:
+            return self._call(changes)
+        with self._lock:
+            for path, (old, new) in changes.items():
+                if path in self._pending:
+                    old = self._pending[path][0]
+                self._pending[path] = old, new
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            changes, self._pending, self._timer = self._pending, {}, None
+        changes = {
+            path: (old, new)
+            for path, (old, new) in changes.items()
+            if old != new
+        }
+        if changes:
+            self._call(changes)
+
+    def _call(self, changes: Changes) -> None:
+        if self.executor is not None:
+            self.executor.submit(self.callback, changes)
+            return
+        try:
+            self.callback(changes)
+        except Exception:
+            logger.exception("subscriber to %r failed", ".".join(self.path))
+
+    def cancel(self) -> None:
+        """Stop receiving changes, pending debounced ones being dropped."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._pending, self._timer = {}, None
+        if self in self._root._subscriptions:
+            self._root._subscriptions.remove(self)
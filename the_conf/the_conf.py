@@ -1,13 +1,25 @@
+import asyncio
 import logging
 import os
+import threading
+import time
+from array import array
+from functools import lru_cache, partial
 
 from the_conf import (
+    cache,
     command_line,
     environement,
     files,
     interractive,
+    flusher,
     node,
+    provenance,
+    shared,
+    snapshot,
+    stats,
     utils,
+    watcher,
 )
 
 logger = logging.getLogger(__name__)
@@ -20,8 +32,36 @@ DEFAULT_PASSKEY_ENVIRON = ("THECONF_PASSKEY",)
 
 class TheConf(node.ConfNode):
     def __init__(
-        self, *metaconfs, prompt_values=False, cmd_line_opts=None, environ=None
+        self,
+        *metaconfs,
+        prompt_values=False,
+        cmd_line_opts=None,
+        environ=None,
+        metaconf_cache=False,
+        lazy=False,
+        load_stats=False,
+        load_hooks=(),
+        load=True,
+        executor=None,
+        track_origins=False,
+        reloadable=False,
     ):
+        """metaconf_cache: if True or a directory path, the compiled schema
+        of metaconfs given as file paths will be cached on disk (by default in
+        the XDG cache directory) and reused as long as they don't change.
+        lazy: if True, nested nodes are only built on first access, values
+        loaded for them being kept in compact records until then.
+        load_stats: if True, what loading took is recorded in load_stats.
+        load_hooks: callables given the name, duration and details of each
+        load phase and config file as they complete, implies load_stats.
+        load: if False, values are only loaded on load().
+        executor: where config files are read and parsed in parallel, a
+        shared thread pool if None.
+        track_origins: if True, the source of each value is kept track of,
+        see origin().
+        reloadable: if True, the values each source provided are kept for
+        reload() and watch() to weigh them again, at the cost of memory.
+        """
         self._source_order = list(DEFAULT_ORDER)
         self._config_files = []
         self._config_file_cmd_line = list(DEFAULT_CONFIG_FILE_CMD_LINE)
@@ -32,7 +72,26 @@ class TheConf(node.ConfNode):
         self._cmd_line_opts = cmd_line_opts
         self._environ = environ
         self._prompt_values = prompt_values
+        self._lazy_nodes = lazy
         self._passkey = None
+        self._backends = {}
+        self._schema = {}
+        self._environ_matcher = None
+        self._sources = {}
+        self._reloadable = reloadable
+        self._watcher = None
+        self._flusher = None
+        self._serialized = None
+        self._write_lock = threading.RLock()
+        self._reload_lock = threading.RLock()  # guards _sources
+        self._load_stats = None
+        self._executor = executor
+        self._accessors = lru_cache(node.ACCESSORS_CACHE_SIZE)(
+            self._compile_accessor
+        )
+        if load_stats or load_hooks:
+            self._load_stats = stats.LoadStats(load_hooks)
+            start = time.perf_counter()
 
         def is_default(value, default):
             if not value or isinstance(value, tuple):
@@ -57,6 +116,13 @@ class TheConf(node.ConfNode):
                 value.extend(new_value)
 
         super().__init__()
+        cache_path = None
+        if metaconf_cache and all(isinstance(mc, str) for mc in metaconfs):
+            cache_path = cache.get_cache_path(
+                metaconfs, metaconf_cache, lazy=lazy
+            )
+            if cache_path is not None and cache.load(cache_path, self):
+                metaconfs = ()
         for mc in metaconfs:
             if isinstance(mc, str):
                 _, mc = next(files.read([mc]))
@@ -74,29 +140,204 @@ class TheConf(node.ConfNode):
                 "passkey_environ", mc, DEFAULT_PASSKEY_ENVIRON
             )
             set_metaconf_setting("config_files", mc, None)
+            self._backends.update(mc.get("backends") or {})
 
             self._load_parameters(mc["parameters"])
-        self.load()
+        if metaconfs and cache_path is not None:
+            cache.dump(cache_path, self)
+        if track_origins:
+            self._provenance = provenance.Provenance(self._schema)
+        if self._load_stats is not None:
+            self._load_stats.add_phase("metaconf", time.perf_counter() - start)
+        if load:
+            self.load()
+
+    def _load_parameters(self, parameters):
+        super()._load_parameters(parameters)
+        # compiling the schema into a flat index once and for all, so that
+        # loaders don't have to walk the whole node tree on each pass
+        self._schema = {
+            path: (param, owner) for path, param, owner in self._iter_schema()
+        }
+        self._environ_matcher = None
+
+    def _get_path_val_param(self, absolute=True, keys=None):
+        expanded = set()
+        for path, (param, owner) in self._schema.items():
+            if keys is not None and path[0] not in keys:
+                continue
+            if isinstance(owner, node.LIST_NODE_TYPES):
+                if id(owner) not in expanded:
+                    expanded.add(id(owner))
+                    yield from owner._get_path_val_param()
+                continue
+            yield list(path), owner._get_value(path[-1]), param
+
+    def _get_schema_paths(self):
+        """Return the schema paths values should be set for from a source.
+
+        Lists that already hold items have been filled by a source of higher
+        priority and are thus left alone.
+        """
+        return {
+            path
+            for path, (_, owner) in self._schema.items()
+            if not isinstance(owner, node.LIST_NODE_TYPES) or not owner
+        }
+
+    @staticmethod
+    def _get_schema_path(path):
+        return tuple(
+            utils.Index if isinstance(part, int) else part for part in path
+        )
+
+    def _record_source(self, source, values):
+        """Yield the values a source provides which are to be set, keeping
+        track of all of them if they're to be weighted again later, on
+        reload or to find out their origins.
+        """
+        paths = self._get_schema_paths()
+        if self._reloadable or self._provenance is not None:
+            values = list(values)
+            self._sources[source] = self._make_record(values)
+        for path, value in values:
+            if self._get_schema_path(path) in paths:
+                yield list(path), value
+
+    def _make_record(self, values):
+        """Return a dict mapping the path of each value to the value.
 
-    def _load_files(self):
+        Items of lists are held as a whole, by the path of their list, with
+        the semantics of _set_to_path (missing items being appended): in a
+        list, of dicts for lists of nodes, or in an array for compact lists.
+        """
+        record, lists = {}, {}
+        for path, value in values:
+            path = tuple(path)
+            _, owner = self._schema.get(
+                self._get_schema_path(path), (None, None)
+            )
+            if not isinstance(owner, node.LIST_NODE_TYPES):
+                record[path] = value
+                continue
+            size = len(owner._path)
+            list_path = path[:size]
+            if list_path not in lists:
+                lists[list_path], record[list_path] = owner, []
+            items, index = record[list_path], path[size]
+            if owner._children:
+                while len(items) <= index:
+                    items.append({})
+                items[index].setdefault(path[size + 1], value)
+            elif index < len(items):
+                items[index] = value
+            else:
+                items.append(value)
+        for list_path, owner in lists.items():
+            if isinstance(owner, node.ArrayListNode):
+                try:
+                    record[list_path] = array(
+                        owner._array.typecode, record[list_path]
+                    )
+                except (TypeError, OverflowError):
+                    pass
+        return record
+
+    def _set_to_path(self, path, value, overwrite=False):
+        try:
+            _, owner = self._schema[tuple(path)]
+        except KeyError:  # value living in a list, walking the tree
+            return super()._set_to_path(path, value, overwrite=overwrite)
+        if owner is self:
+            return super()._set_to_path(path, value, overwrite=overwrite)
+        return owner._set_to_path(path[-1:], value, overwrite=overwrite)
+
+    def _extract_files(self, parsed):
+        """Yield each config file with the values it holds for the schema,
+        parsed being an iterable of (config file, parsed content)."""
+        all_paths = list(map(list, self._schema))
+        for conf_file, config in parsed:
+            yield conf_file, files.extract_values(all_paths, config, conf_file)
+
+    def _load_files(self, parsed=None, file_stats=None):
+        """Set values from config files, read on the go unless already
+        parsed, file_stats then describing their reading."""
         if not self._config_files:
-            return
-        for conf_file, config in files.read(self._config_files, self._passkey):
-            paths = list(path for path, _, _ in self._get_path_val_param())
-            for path, value in files.extract_values(paths, config, conf_file):
+            return 0
+        load_stats, count = self._load_stats, 0
+        if parsed is None:
+            file_stats = None if load_stats is None else []
+            parsed = files.read(
+                self._config_files,
+                self._passkey,
+                self._backends,
+                file_stats,
+                self._executor,
+            )
+        for index, (conf_file, values) in enumerate(
+            self._extract_files(parsed)
+        ):
+            if load_stats is not None:
+                start = time.perf_counter()
+            values, batches = self._split_compact(
+                self._record_source(conf_file, values)
+            )
+            file_count = len(values) + sum(len(items) for _, items in batches)
+            count += file_count
+            for path, value in values:
                 try:
                     self._set_to_path(path, value, overwrite=False)
                 except Exception as error:
                     logger.exception(
                         "failed to write path %r=%r from file %r",
-                        ".".join(path),
+                        ".".join(map(str, path)),
                         value,
                         conf_file,
                     )
+            for owner, items in batches:
+                try:
+                    owner._set_items(items)
+                except Exception as error:
+                    logger.exception(
+                        "failed to write path %r from file %r",
+                        ".".join(owner._path),
+                        conf_file,
+                    )
+            if load_stats is not None:
+                details = file_stats[index]
+                details.update(
+                    extract=time.perf_counter() - start, values=file_count
+                )
+                details["duration"] = sum(
+                    details.get(step, 0.0)
+                    for step in ("read", "decrypt", "parse", "extract")
+                )
+                load_stats.add_file(details)
+        return count
+
+    def _split_compact(self, values):
+        """Set aside items of lists with compact storage, grouped by list, so
+        that they can be converted and set in batch."""
+        regular, batches = [], {}
+        for path, value in values:
+            if isinstance(path[-1], int):
+                _, owner = self._schema.get(
+                    self._get_schema_path(path), (None, None)
+                )
+                if isinstance(owner, node.ArrayListNode):
+                    batches.setdefault(id(owner), (owner, []))[1].append(
+                        (path[-1], value)
+                    )
+                    continue
+            regular.append((path, value))
+        return regular, list(batches.values())
 
     def _load_cmd(self, opts=None):
         gen = command_line.yield_values_from_cmd(
-            list(self._get_path_val_param()),
+            [
+                (list(path), utils.NoValue, param)
+                for path, (param, _) in self._schema.items()
+            ],
             self._cmd_line_opts,
             self._config_file_cmd_line,
             self._passkey_cmd_line,
@@ -108,8 +349,10 @@ class TheConf(node.ConfNode):
         if passkey:
             self._passkey = passkey
 
-        for path, value in gen:
+        values = list(self._record_source("cmd", gen))
+        for path, value in values:
             self._set_to_path(path, value, overwrite=False)
+        return len(values)
 
     def _load_env(self, environ=None):
         if environ is None:  # defaulting to os.environ
@@ -123,13 +366,22 @@ class TheConf(node.ConfNode):
             if passkey_env_key in environ:
                 self._passkey = environ[passkey_env_key]
         # Extracting values present in environ matching a given path
-        for path, _, _ in self._get_path_val_param():
-            for (
-                actual_path,
-                environ_value,
-            ) in environement.iter_on_environ_from_path(path, environ):
-                self._set_to_path(actual_path, environ_value)
-        # Removing empty nodes that might have been created from malformed env
+        if self._environ_matcher is None:
+            self._environ_matcher = environement.EnvironMatcher(self._schema)
+        matches = self._environ_matcher.match(environ)
+        values, batches = self._split_compact(
+            self._record_source("env", (match[1:] for match in matches))
+        )
+        for path, value in values:
+            self._set_to_path(path, value)
+        for owner, items in batches:
+            owner._set_items(items)
+        self._remove_empty_list_items()
+        return len(values) + sum(len(items) for _, items in batches)
+
+    def _remove_empty_list_items(self):
+        """Removing empty nodes that might have been created from malformed
+        env"""
         for path in environement.index_to_remove(self._get_path_val_param()):
             obj = self
             for part in path:
@@ -138,47 +390,496 @@ class TheConf(node.ConfNode):
                 else:
                     obj.pop(part)
 
-    def load(self):
+    def _get_sources_order(self):
         for order in self._source_order:
             if order == "files":
-                self._load_files()
-            elif order == "cmd":
-                self._load_cmd(self._cmd_line_opts)
-            elif order == "env":
-                self._load_env(self._environ)
+                yield from files.expand_paths(self._config_files)
             else:
-                raise ValueError(f"unknown order {order!r}")
+                yield order
+
+    def _get_files_to_reload(self, config_files):
+        if config_files is None:
+            config_files = files.expand_paths(self._config_files)
+            # files loaded before which vanished from directories or globs
+            config_files += [
+                source
+                for source in self._sources
+                if source not in DEFAULT_ORDER and source not in config_files
+            ]
+        else:
+            config_files = files.expand_paths(config_files)
+        for conf_file in config_files:
+            files.invalidate_cache(conf_file)
+        return config_files
+
+    def _check_reloadable(self):
+        if not self._reloadable:
+            raise ValueError("reloading isn't enabled, see reloadable")
 
+    def reload(self, config_files=None):
+        """Read config files again, all of them by default, and set the
+        values that changed, source_order precedence being kept.
+
+        Return the paths (lists being changed as a whole) which value changed.
+        Requires reloadable.
+        """
+        self._check_reloadable()
+        with self._reload_lock:
+            config_files = self._get_files_to_reload(config_files)
+            parsed = dict(
+                files.read(
+                    config_files,
+                    self._passkey,
+                    self._backends,
+                    executor=self._executor,
+                )
+            )
+            with self.transaction():
+                return self._reload(config_files, parsed)
+
+    async def areload(self, config_files=None, executor=None):
+        """Same as reload, config files being read, decrypted and parsed
+        concurrently in executor, the one given at init or the default one
+        of the loop if None."""
+        self._check_reloadable()
+        with self._reload_lock:
+            config_files = self._get_files_to_reload(config_files)
+        parsed = dict(
+            await files.aread(
+                config_files,
+                self._passkey,
+                self._backends,
+                executor=executor or self._executor,
+            )
+        )
+        # not held while parsing, the event loop would be blocked
+        with self._reload_lock, self.transaction():
+            return self._reload(config_files, parsed)
+
+    def _reload(self, config_files, parsed):
+        changed = set()
+        for conf_file in config_files:
+            old_record = self._sources.pop(conf_file, {})
+            if conf_file in parsed:
+                for _, values in self._extract_files(
+                    [(conf_file, parsed[conf_file])]
+                ):
+                    self._sources[conf_file] = self._make_record(values)
+            new_record = self._sources.get(conf_file, {})
+            for path in old_record.keys() | new_record.keys():
+                if old_record.get(path, utils.NoValue) != new_record.get(
+                    path, utils.NoValue
+                ):
+                    changed.add(self._get_schema_path(path))
+        records = self._get_records()
+        modified, lists = [], {}
+        for path in changed:
+            if path in self._schema:
+                _, owner = self._schema[path]
+            else:  # list recorded as a whole
+                owner = node.compile_getter(path)(self)
+            if isinstance(owner, node.LIST_NODE_TYPES):
+                lists[id(owner)] = owner
+            elif self._reset_path(path, owner, records):
+                modified.append(path)
+        for owner in lists.values():
+            if self._reset_list(owner, records):
+                modified.append(tuple(owner._path))
+        if self._provenance is not None:
+            self._provenance.build(records, changed)
+        return modified
+
+    def _get_records(self):
+        """Return the values recorded for each source, by precedence."""
+        return [
+            (source, self._sources[source])
+            for source in self._get_sources_order()
+            if source in self._sources
+        ]
+
+    def _reset_path(self, path, owner, records):
+        before = owner._get_value(path[-1])
+        for _, record in records:
+            if path in record:
+                self._set_to_path(list(path), record[path], overwrite=True)
+                break
+        else:
+            if owner._has_attr(path[-1]):
+                delattr(owner, path[-1])
+        return owner._get_value(path[-1]) != before
+
+    def _reset_list(self, owner, records):
+        """Set the items of owner out of the first source holding some.
+
+        New items are built aside and swapped in at once, so that readers,
+        the watcher running in its own thread, never see a partial list.
+        """
+        before = owner._freeze()
+        prefix = tuple(owner._path)
+        values = []
+        for source, record in records:
+            if prefix not in record:
+                continue
+            values = record[prefix]
+            if owner._children:
+                values = list(map(owner._cast, values))
+            if source == "env":  # dropping items of malformed env
+                values = [
+                    item
+                    for item in values
+                    if not isinstance(item, node.ConfNode)
+                    or any(
+                        value is not utils.NoValue
+                        for _, value, _ in item._get_path_val_param()
+                    )
+                ]
+            break
+        owner[:] = values
+        return owner._freeze() != before
+
+    def watch(self, interval=1.0):
+        """Watch config files in a background thread, reloading them as they
+        change. Changes are detected through inotify when inotify_simple is
+        installed, by polling files every interval seconds otherwise.
+        Requires reloadable.
+        """
+        self._check_reloadable()
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = watcher.Watcher(self, interval)
+            self._watcher.start()
+        return self._watcher
+
+    @property
+    def load_stats(self):
+        """The LoadStats of the last load, None unless asked for."""
+        return self._load_stats
+
+    def _load_source(self, order, *args):
+        """Load values from the source order, return how many were set."""
+        if order == "files":
+            return self._load_files(*args)
+        if order == "cmd":
+            return self._load_cmd(self._cmd_line_opts)
+        if order == "env":
+            return self._load_env(self._environ)
+        raise ValueError(f"unknown order {order!r}")
+
+    def _run_source(self, order, *args):
+        load_stats = self._load_stats
+        if load_stats is None:
+            self._load_source(order, *args)
+            return
+        start = time.perf_counter()
+        values = self._load_source(order, *args)
+        load_stats.add_phase(order, time.perf_counter() - start, values=values)
+
+    def _start_load(self):
+        if self._load_stats is not None:
+            self._load_stats.reset()
+        self._sources = {}
+
+    def _finish_load(self):
+        if self._provenance is not None:
+            self._provenance.build(self._get_records())
+        if not self._reloadable:  # only kept for reload
+            self._sources = {}
         if self._prompt_values:
             self.prompt_values(False, False, False, False)
 
+        load_stats = self._load_stats
+        if load_stats is not None:
+            start = time.perf_counter()
         for path, value, param in self._get_path_val_param():
             if value is utils.NoValue and param.get("required"):
                 raise ValueError(
                     f"loading finished and {'.'.join(path)!r} " "is not set"
                 )
+        if load_stats is not None:
+            load_stats.add_phase("check", time.perf_counter() - start)
 
-    def _extract_config(self):
-        config = {}
-        for paths, value, param in self._get_path_val_param():
+    def load(self):
+        self._start_load()
+        for order in self._source_order:
+            self._run_source(order)
+        self._finish_load()
+
+    @classmethod
+    async def aload(cls, *metaconfs, **kwargs):
+        """Build a TheConf without blocking the running event loop.
+
+        Metaconfs are compiled in the default executor of the loop, config
+        files are read, decrypted and parsed concurrently in the executor
+        given as keyword argument (the default one of the loop if None),
+        values being then set in source_order exactly as load() would.
+        """
+        loop = asyncio.get_running_loop()
+        conf = await loop.run_in_executor(
+            None, partial(cls, *metaconfs, load=False, **kwargs)
+        )
+        conf._start_load()
+        for order in conf._source_order:
+            if order != "files" or not conf._config_files:
+                conf._run_source(order)
+                continue
+            file_stats = None if conf._load_stats is None else []
+            parsed = await files.aread(
+                conf._config_files,
+                conf._passkey,
+                conf._backends,
+                file_stats,
+                conf._executor,
+            )
+            conf._run_source(order, parsed, file_stats)
+        conf._finish_load()
+        return conf
+
+    def get(self, path, default=None):
+        """Return the value at path, a dotted string or a sequence, list
+        indexes included. Return default if there is no value there.
+
+        Accessors are compiled once per path and kept in a LRU cache.
+        """
+        if not isinstance(path, str):
+            path = tuple(path)
+        # sparing ConfNode.__getattribute__, this is meant for hot paths
+        return object.__getattribute__(self, "_accessors")(path)(default)
+
+    def _compile_accessor(self, path):
+        """Return a callable given a default and returning the value at
+        path. Values out of lists are read right from the dict of the node
+        holding them, nodes never moving once built."""
+        steps = node.split_path(path)
+        if steps not in self._schema:  # lists, nodes or unknown paths
+            return self._compile_list_accessor(steps)
+        settings, _ = self._schema[steps]
+        owner = node.compile_getter(steps[:-1])(self) if steps[:-1] else self
+        values, name = owner.__dict__, steps[-1]
+
+        def accessor(default):
+            value = values.get(name, utils.NoValue)
             if value is utils.NoValue:
+                return settings.get("default", default)
+            if type(value) is node.Secret:
+                return value.reveal(self._passkey)
+            return value
+
+        return accessor
+
+    def _compile_list_accessor(self, steps):
+        """Same as _compile_accessor for paths which aren't values of the
+        schema. What lies before the first index is resolved once, list
+        items being walked through on each call."""
+        if not steps:
+            raise KeyError(steps)
+        first = next(
+            (i for i, step in enumerate(steps) if isinstance(step, int)),
+            len(steps),
+        )
+        try:
+            owner = node.compile_getter(steps[:first])(self)
+        except (AttributeError, KeyError):  # unknown or starting with index
+            owner = None
+        if not isinstance(owner, node.AbstractNode):
+            owner, first = self, 0
+        if first == len(steps):
+            return lambda default: owner
+        getter = node.compile_getter(steps[first:])
+
+        def accessor(default):
+            try:
+                return getter(owner)
+            except (AttributeError, IndexError):
+                return default
+
+        return accessor
+
+    def origin(self, path):
+        """Return the Origin of the value at path, a dotted string or a
+        sequence: the source it was read from, "set" if assigned once loaded
+        or "default". None if there is no value at path, or if path leads to
+        a node.
+
+        Requires track_origins.
+        """
+        if self._provenance is None:
+            raise ValueError("origins aren't tracked, see track_origins")
+        path = node.split_path(path)
+        if not path:
+            raise KeyError(path)
+        parent = self
+        try:
+            for part in path[:-1]:
+                if isinstance(part, int):
+                    parent = parent[part]
+                else:
+                    parent = parent._get_child(part)
+        except (IndexError, TypeError):
+            return None
+        name = path[-1]
+        if isinstance(parent, node.LIST_NODE_TYPES):
+            is_set = isinstance(name, int) and name < len(parent)
+            if is_set and isinstance(parent[name], node.AbstractNode):
+                return None  # item of a list of nodes
+        elif isinstance(parent, (node.AbstractNode, node.LazyNode)):
+            child = parent._get_child(name)
+            if isinstance(child, node.LIST_NODE_TYPES):
+                is_set = len(child) > 0
+            elif isinstance(child, (node.AbstractNode, node.LazyNode)):
+                return None
+            else:
+                is_set = parent._has_attr(name)
+            if not is_set and "default" in parent._parameters.get(name, {}):
+                return provenance.Origin("default")
+        else:
+            return None
+        if not is_set:
+            return None
+        return self._provenance.get(path) or provenance.Origin("set")
+
+    def origins(self):
+        """Return the Origin of every value, by dotted path."""
+        return {
+            ".".join(map(str, path)): self.origin(path)
+            for path, value, _ in self._get_path_val_param()
+            if value is not utils.NoValue and utils.Index not in path
+        }
+
+    def freeze(self):
+        """Return an immutable snapshot of the loaded values, defaults
+        resolved, to be read from hot paths. Lists are turned into tuples.
+        """
+        return self._freeze()
+
+    def dump_snapshot(self, path):
+        """Store the loaded values at path, with stamps of the schema, config
+        files, environ and command line they were loaded from."""
+        snapshot.dump(path, self)
+
+    @classmethod
+    def load_snapshot(cls, path, *metaconfs, **kwargs):
+        """Build a TheConf out of the snapshot at path if what it was loaded
+        from didn't change since, loading it the usual way and refreshing the
+        snapshot otherwise."""
+        conf = cls(*metaconfs, load=False, **kwargs)
+        if conf._load_stats is not None:
+            start = time.perf_counter()
+        if snapshot.load(path, conf):
+            if conf._load_stats is not None:
+                conf._load_stats.add_phase(
+                    "snapshot", time.perf_counter() - start
+                )
+            return conf
+        conf.load()
+        conf.dump_snapshot(path)
+        return conf
+
+    def to_shared(self, path=None):
+        """Write the resolved values, defaults included, to path, a new file
+        in shared memory if None, and return the path. Processes can then
+        read them through from_shared(), without loading anything.
+
+        Secrets are written encrypted with the passkey, sharing them without
+        one raises ValueError. The file is only readable by its owner.
+        """
+        return shared.dump(self._freeze(reveal=False), path, self._passkey)
+
+    @staticmethod
+    def from_shared(path, passkey=None):
+        """Return a read-only node over the values written to path by
+        to_shared(). They are decoded on first read from a memory mapping of
+        the file, which pages are shared by all the processes reading it.
+        Secrets are decrypted with passkey.
+        """
+        return shared.attach(path, passkey)
+
+    def _extract_config(self, keys=None):
+        config = {}
+        for paths, value, param in self._get_path_val_param(keys=keys):
+            if value is utils.NoValue or utils.Index in paths:
                 continue
             if "default" in param and value == param["default"]:
                 continue
+            if isinstance(value, node.Secret):
+                value = value.dump(self._passkey)
             curr_config = config
-            for path in paths[:-1]:
-                curr_config[path] = {}
-                curr_config = curr_config[path]
-            curr_config[paths[-1]] = value
+            for path, next_path in zip(paths[:-1], paths[1:]):
+                container = [] if isinstance(next_path, int) else {}
+                if isinstance(path, int):  # filling holes left by defaults
+                    while len(curr_config) <= path:
+                        curr_config.append({})
+                    if not curr_config[path]:
+                        curr_config[path] = container
+                    curr_config = curr_config[path]
+                else:
+                    curr_config = curr_config.setdefault(path, container)
+            if isinstance(paths[-1], int):
+                curr_config.append(value)
+            else:
+                curr_config[paths[-1]] = value
+        return config
+
+    def _get_config_to_write(self):
+        """Return the config to write, reusing the top level keys of the
+        last serialization which weren't set or deleted since. Keys holding
+        lists are always extracted again as lists can be mutated in place.
+        """
+        dirty, self._dirty = self._dirty, set()
+        if dirty is None or self._serialized is None:
+            self._serialized = self._extract_config()
+            return self._serialized
+        order, list_keys = [], set()
+        for path, (_, owner) in self._schema.items():
+            if not order or order[-1] != path[0]:
+                order.append(path[0])
+            if isinstance(owner, node.LIST_NODE_TYPES):
+                list_keys.add(path[0])
+        fresh = self._extract_config(dirty | list_keys)
+        config = {}
+        for key in order:
+            if key in fresh:
+                config[key] = fresh[key]
+            elif key not in dirty and key not in list_keys:
+                if key in self._serialized:
+                    config[key] = self._serialized[key]
+        self._serialized = config
         return config
 
-    def write(self, config_file=None):
+    def write(self, config_file=None, passkey=None):
+        """Write values differing from defaults to config_file, the first
+        config file by default. The file is encrypted with passkey, or with
+        the one configuration has been loaded with, if any.
+        """
         if config_file is None and not self._config_files:
             raise ValueError("no config file to write in")
 
-        files.write(
-            self._extract_config(), config_file or self._config_files[0]
-        )
+        with self._write_lock:
+            return files.write(
+                self._get_config_to_write(),
+                config_file or self._config_files[0],
+                self._backends,
+                passkey or self._passkey,
+            )
+
+    def write_behind(self, interval=1.0, config_file=None, passkey=None):
+        """Coalesce changes into a single write: values set from now on are
+        written by a background thread every interval seconds, if any
+        changed, or on flush(). Stopping the returned thread flushes a last
+        time.
+        """
+        if config_file is None and not self._config_files:
+            raise ValueError("no config file to write in")
+        if self._flusher is not None:
+            self._flusher.stop()
+        self._flusher = flusher.Flusher(self, interval, config_file, passkey)
+        self._flusher.start()
+        return self._flusher
+
+    def flush(self):
+        """Write pending changes right away, return whether the file was
+        written. Without write_behind(), this is a plain write()."""
+        if self._flusher is None:
+            return self.write()
+        return self._flusher.flush(force=True)
 
     def prompt_values(
         self,
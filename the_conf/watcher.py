@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+from os.path import abspath, dirname, expanduser, isdir
+
+from the_conf import files
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+
+class Watcher(threading.Thread):
+    """Thread watching the config files of a TheConf and reloading those
+    which changed.
+
+    Files are considered changed when their mtime or size differ. Without
+    inotify, files are checked every interval seconds; with it, they're
+    checked as soon as something happens in their directories.
+    """
+
+    def __init__(self, conf, interval=1.0):
+        super().__init__(name="the_conf-watcher", daemon=True)
+        self._conf = conf
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._stamps = self._get_stamps()
+
+    def _get_stamps(self):
+        stamps = {}
+        for conf_file in files.expand_paths(self._conf._config_files):
+            try:
+                stat = os.stat(conf_file)
+            except OSError:
+                stamps[conf_file] = None
+            else:
+                stamps[conf_file] = stat.st_mtime_ns, stat.st_size
+        return stamps
+
+    def check(self):
+        """Reload the files which changed since last check, return the paths
+        which value changed."""
+        stamps = self._get_stamps()
+        changed = sorted(
+            conf_file
+            for conf_file in stamps.keys() | self._stamps.keys()
+            if self._stamps.get(conf_file) != stamps.get(conf_file)
+        )
+        self._stamps = stamps
+        if not changed:
+            return []
+        logger.info("reloading changed config files %r", changed)
+        return self._conf.reload(changed)
+
+    def _wait(self, notifier):
+        if notifier is None:
+            return not self._stopped.wait(self._interval)
+        notifier.read(timeout=int(self._interval * 1000))
+        return not self._stopped.is_set()
+
+    def _get_notifier(self):
+        if inotify_simple is None:
+            return None
+        flags = inotify_simple.flags
+        notifier = inotify_simple.INotify()
+        directories = {dirname(conf_file) for conf_file in self._stamps}
+        for conf_file in self._conf._config_files:
+            conf_file = abspath(expanduser(conf_file.strip()))
+            if isdir(conf_file):  # watching for files added to it
+                directories.add(conf_file)
+        for directory in directories:
+            try:
+                notifier.add_watch(
+                    directory,
+                    flags.CLOSE_WRITE
+                    | flags.MOVED_TO
+                    | flags.CREATE
+                    | flags.DELETE
+                    | flags.MOVED_FROM,
+                )
+            except OSError:
+                logger.debug("can't watch %r, polling it", directory)
+        return notifier
+
+    def run(self):
+        notifier = self._get_notifier()
+        try:
+            while self._wait(notifier):
+                try:
+                    self.check()
+                except Exception:
+                    logger.exception("failed to reload config files")
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def stop(self):
+        self._stopped.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()